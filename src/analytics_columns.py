@@ -0,0 +1,288 @@
+"""
+Columnar view of the analytics transaction history.
+
+Transactions are held as parallel NumPy arrays (timestamps, amounts) plus
+categorical codes for faucet, initiator and network, so the chart
+aggregations in main.py become group-bys over integer codes instead of
+Python loops over one dict per record.
+
+Run `python -m src.analytics_columns` for a benchmark on synthetic claims.
+"""
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+
+
+class Categorical:
+    """Dictionary-encoded string column: codes[i] indexes into labels"""
+
+    def __init__(self, codes: np.ndarray, labels: List[str]):
+        self.codes = codes
+        self.labels = labels
+
+    @classmethod
+    def encode(cls, values: Iterable[str]) -> "Categorical":
+        # Codes are assigned in order of first appearance, which keeps
+        # "first record seen for this key" semantics cheap to recover.
+        lookup: Dict[str, int] = {}
+        codes = np.fromiter(
+            (lookup.setdefault(value, len(lookup)) for value in values),
+            dtype=np.int64
+        )
+        return cls(codes, list(lookup))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def counts(self) -> np.ndarray:
+        return np.bincount(self.codes, minlength=len(self.labels))
+
+    def first_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(codes present, row index of each one's first occurrence)"""
+        return np.unique(self.codes, return_index=True)
+
+    def select(self, mask: np.ndarray) -> "Categorical":
+        # Labels are shared, so codes of a subset stay comparable with the parent
+        return Categorical(self.codes[mask], self.labels)
+
+
+class TransactionColumns:
+    """Analytics transactions (or claims) stored column-wise"""
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        amounts: np.ndarray,
+        faucets: Categorical,
+        initiators: Categorical,
+        networks: Categorical,
+        chain_ids: np.ndarray,
+        factories: Categorical,
+        token_symbols: np.ndarray,
+        token_decimals: np.ndarray,
+        is_claim: np.ndarray
+    ):
+        self.timestamps = timestamps
+        self.amounts = amounts
+        self.faucets = faucets
+        self.initiators = initiators
+        self.networks = networks
+        self.chain_ids = chain_ids
+        self.factories = factories
+        self.token_symbols = token_symbols
+        self.token_decimals = token_decimals
+        self.is_claim = is_claim
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "TransactionColumns":
+        """Build the columns from the transaction dicts produced by the analytics fetchers"""
+        n = len(records)
+
+        def parse_amount(amount: Any) -> int:
+            if isinstance(amount, str) and amount.isdigit():
+                return int(amount)
+            return 0
+
+        # Amounts are uint256, so they stay Python ints in an object array
+        amounts = np.empty(n, dtype=object)
+        amounts[:] = [parse_amount(r.get('amount', 0)) for r in records]
+
+        return cls(
+            timestamps=np.fromiter((r.get('timestamp', 0) or 0 for r in records), dtype=np.int64, count=n),
+            amounts=amounts,
+            faucets=Categorical.encode((r.get('faucetAddress') or '').lower() for r in records),
+            initiators=Categorical.encode((r.get('initiator') or r.get('claimer') or '').lower() for r in records),
+            networks=Categorical.encode(r.get('networkName', 'Unknown') for r in records),
+            chain_ids=np.fromiter((r.get('chainId', 0) or 0 for r in records), dtype=np.int64, count=n),
+            factories=Categorical.encode(r.get('factoryAddress') or '' for r in records),
+            token_symbols=np.array([r.get('tokenSymbol', 'ETH') for r in records], dtype=object),
+            token_decimals=np.fromiter((r.get('tokenDecimals', 18) for r in records), dtype=np.int64, count=n),
+            is_claim=np.fromiter(('claim' in (r.get('transactionType') or '').lower() for r in records), dtype=bool, count=n)
+        )
+
+    def select(self, mask: np.ndarray) -> "TransactionColumns":
+        """Row subset (e.g. claims only) sharing this instance's categorical labels"""
+        return TransactionColumns(
+            timestamps=self.timestamps[mask],
+            amounts=self.amounts[mask],
+            faucets=self.faucets.select(mask),
+            initiators=self.initiators.select(mask),
+            networks=self.networks.select(mask),
+            chain_ids=self.chain_ids[mask],
+            factories=self.factories.select(mask),
+            token_symbols=self.token_symbols[mask],
+            token_decimals=self.token_decimals[mask],
+            is_claim=self.is_claim[mask]
+        )
+
+    def claims(self) -> "TransactionColumns":
+        return self.select(self.is_claim)
+
+    # ------------------------------------------------------------------
+    # Group-bys used by the rollup aggregation (analytics_rollups)
+    # ------------------------------------------------------------------
+
+    def days(self) -> np.ndarray:
+        """UTC day number (days since epoch) of every row"""
+        return self.timestamps // SECONDS_PER_DAY
+
+    def valid_initiator_mask(self) -> np.ndarray:
+        """Labels that look like wallet addresses (same rule as the old dict loop)"""
+        return np.array([label.startswith('0x') for label in self.initiators.labels], dtype=bool)
+
+    def first_day_per_initiator(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (initiator codes, first UTC day each of them appears), restricted to
+        initiators that look like addresses.
+        """
+        n_users = len(self.initiators)
+        unseen = np.iinfo(np.int64).max
+        first_day = np.full(n_users, unseen, dtype=np.int64)
+        np.minimum.at(first_day, self.initiators.codes, self.days())
+
+        user_codes = np.flatnonzero(self.valid_initiator_mask() & (first_day != unseen))
+        return user_codes, first_day[user_codes]
+
+    def per_faucet(self) -> List[Dict[str, Any]]:
+        """Claim count, amount sum, latest timestamp and first-seen attributes per faucet"""
+        codes = self.faucets.codes
+        n_faucets = len(self.faucets)
+        if len(codes) == 0:
+            return []
+
+        counts = np.bincount(codes, minlength=n_faucets)
+        latest = np.zeros(n_faucets, dtype=np.int64)
+        np.maximum.at(latest, codes, self.timestamps)
+        totals = np.zeros(n_faucets, dtype=object)
+        np.add.at(totals, codes, self.amounts)
+        present, first = self.faucets.first_index()
+
+        return [
+            {
+                "faucetAddress": self.faucets.labels[code],
+                "claims": int(counts[code]),
+                "network": self.networks.labels[self.networks.codes[row]],
+                "chainId": int(self.chain_ids[row]),
+                "totalAmount": totals[code],
+                "tokenSymbol": self.token_symbols[row],
+                "tokenDecimals": int(self.token_decimals[row]),
+                "latestTimestamp": int(latest[code])
+            }
+            for code, row in zip(present, first)
+        ]
+
+    def per_network(self) -> List[Dict[str, Any]]:
+        """Row count, chain id and factory addresses (first-seen order) per network"""
+        n_networks = len(self.networks)
+        if len(self.networks.codes) == 0:
+            return []
+
+        counts = self.networks.counts()
+        present, first = self.networks.first_index()
+
+        # Distinct (network, factory) pairs in order of first appearance
+        pair_keys = self.networks.codes * max(len(self.factories), 1) + self.factories.codes
+        _, pair_rows = np.unique(pair_keys, return_index=True)
+        pair_rows.sort()
+        factories_by_network: Dict[int, List[str]] = {code: [] for code in range(n_networks)}
+        for row in pair_rows:
+            factory = self.factories.labels[self.factories.codes[row]]
+            if factory:
+                factories_by_network[int(self.networks.codes[row])].append(factory)
+
+        return [
+            {
+                "name": self.networks.labels[code],
+                "chainId": int(self.chain_ids[row]),
+                "totalTransactions": int(counts[code]),
+                "factoryAddresses": factories_by_network[code]
+            }
+            for code, row in zip(present, first)
+        ]
+
+
+def day_labels(days: np.ndarray) -> List[str]:
+    """UTC day numbers -> 'YYYY-MM-DD' strings, converting only the distinct days"""
+    return np.datetime_as_string(days.astype('datetime64[D]'), unit='D').tolist()
+
+
+def synthetic_claims(n: int, n_users: int = 200_000, n_faucets: int = 2_000, seed: int = 7) -> List[Dict[str, Any]]:
+    """Claim dicts shaped like the analytics fetcher output, for benchmarking"""
+    rng = np.random.default_rng(seed)
+    networks = [("Celo", 42220), ("Arbitrum", 42161), ("Lisk", 1135), ("Base", 8453)]
+    users = [f"0x{i:040x}" for i in range(n_users)]
+    faucets = [f"0x{(i + 1) << 80:040x}" for i in range(n_faucets)]
+
+    user_idx = rng.integers(0, n_users, n)
+    faucet_idx = rng.integers(0, n_faucets, n)
+    timestamps = rng.integers(1_700_000_000, 1_760_000_000, n)
+    amounts = rng.integers(1, 10**6, n) * 10**12
+
+    claims = []
+    for i in range(n):
+        network_name, chain_id = networks[faucet_idx[i] % len(networks)]
+        claims.append({
+            "faucetAddress": faucets[faucet_idx[i]],
+            "transactionType": "claim",
+            "initiator": users[user_idx[i]],
+            "amount": str(int(amounts[i])),
+            "isEther": False,
+            "timestamp": int(timestamps[i]),
+            "networkName": network_name,
+            "chainId": chain_id,
+            "factoryAddress": f"0xfactory{faucet_idx[i] % 3}",
+            "tokenSymbol": "TKN",
+            "tokenDecimals": 18
+        })
+    return claims
+
+
+def dict_loop_first_claim_dates(claims: List[Dict[str, Any]]) -> Dict[str, str]:
+    """The per-record loop the chart code used before, kept as the benchmark baseline"""
+    first_claim = {}
+    for claim in claims:
+        claimer = claim.get('initiator')
+        if claimer and claimer.startswith('0x'):
+            claimer_lower = claimer.lower()
+            date = datetime.fromtimestamp(claim.get('timestamp', 0), tz=timezone.utc).strftime('%Y-%m-%d')
+            if claimer_lower not in first_claim or date < first_claim[claimer_lower]:
+                first_claim[claimer_lower] = date
+    return first_claim
+
+
+def benchmark(n: int = 1_000_000):
+    """Time column building and each group-by on n synthetic claims"""
+    print(f"Generating {n:,} synthetic claims...")
+    claims = synthetic_claims(n)
+
+    timings = {}
+    started = time.perf_counter()
+    columns = TransactionColumns.from_records(claims)
+    timings["from_records"] = time.perf_counter() - started
+
+    for name, fn in [
+        ("first_day_per_initiator", columns.claims().first_day_per_initiator),
+        ("per_faucet", columns.per_faucet),
+        ("per_network", columns.per_network),
+    ]:
+        started = time.perf_counter()
+        fn()
+        timings[name] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    dict_loop_first_claim_dates(claims)
+    timings["dict loop baseline"] = time.perf_counter() - started
+
+    for name, seconds in timings.items():
+        print(f"{name:>24}: {seconds * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
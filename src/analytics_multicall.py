@@ -0,0 +1,80 @@
+"""
+Multicall3 batching for the analytics faucet enumeration.
+
+`aggregate3` runs many view calls in one eth_call; with allowFailure=True a
+reverting call (e.g. name() on a faucet that doesn't implement it) only
+fails its own slot instead of the whole batch. Multicall3 is deployed at the
+same address on every network the analytics pipeline reads.
+
+These helpers are blocking (web3 HTTPProvider); main.py runs them through
+AnalyticsDataManager.call_rpc so they share the RPC semaphore.
+"""
+from typing import Any, List, Optional, Sequence, Tuple
+
+from web3 import Web3
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+# (target contract, function name, output types); view calls without arguments
+MulticallRequest = Tuple[Any, str, Sequence[str]]
+
+
+def chunked(calls: List[MulticallRequest], chunk_size: int) -> List[List[MulticallRequest]]:
+    return [calls[i:i + chunk_size] for i in range(0, len(calls), chunk_size)]
+
+
+def aggregate3(w3: Web3, calls: List[MulticallRequest]) -> List[Optional[Any]]:
+    """
+    Run one batch of calls; each result is the decoded value (a tuple for
+    multi-output functions) or None if that call failed.
+    """
+    multicall = w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+    payload = [
+        (contract.address, True, contract.encode_abi(function_name, args=[]))
+        for contract, function_name, _ in calls
+    ]
+    results = multicall.functions.aggregate3(payload).call()
+
+    decoded = []
+    for (_, _, output_types), (success, return_data) in zip(calls, results):
+        if not success or not return_data:
+            decoded.append(None)
+            continue
+        try:
+            values = w3.codec.decode(list(output_types), return_data)
+        except Exception:
+            decoded.append(None)
+            continue
+        decoded.append(values[0] if len(values) == 1 else tuple(values))
+    return decoded
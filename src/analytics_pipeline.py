@@ -0,0 +1,179 @@
+"""
+Streaming stages for the analytics refresh.
+
+    fetch      per-network transaction lists (one getAllTransactions() per factory)
+    normalize  merge_by_timestamp -> normalize: one chronological record stream
+    aggregate  batched() feeds the incremental aggregators (rollups, indexer)
+    persist    PageWriter encodes pages as they fill (analytics_store)
+
+persist_transactions() runs the last three stages; it is what the refresh
+calls. The fetched per-network lists are held until it returns (they are
+sorted in place), but nothing else grows with the history: there is no
+concatenated copy, no sorted copy, no separate claims list and no list of
+encoded pages, only one batch plus one open page per writer.
+
+Run `python -m src.analytics_pipeline` for a memory benchmark that feeds
+materialized per-network lists, as the fetch stage returns them, to the old
+list-based persist step and to persist_transactions().
+"""
+import asyncio
+import heapq
+import tracemalloc
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .analytics_store import PageWriter, encode_page, split_pages
+
+
+def timestamp_of(tx: Dict[str, Any]) -> int:
+    return tx.get("timestamp", 0) or 0
+
+
+def is_claim(tx: Dict[str, Any]) -> bool:
+    return "claim" in (tx.get("transactionType") or "").lower()
+
+
+def merge_by_timestamp(sources: Iterable[List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+    """
+    Oldest-first stream over several transaction lists. Each list is sorted in
+    place (no copy) and the lists are merged lazily.
+    """
+    for source in sources:
+        source.sort(key=timestamp_of)
+    return heapq.merge(*sources, key=timestamp_of)
+
+
+def normalize(transactions: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Drop records without a timestamp and make amounts decimal strings"""
+    for tx in transactions:
+        if not tx.get("timestamp"):
+            continue
+        if not isinstance(tx.get("amount"), str):
+            tx["amount"] = str(tx.get("amount") or 0)
+        yield tx
+
+
+def batched(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+async def persist_transactions(
+    sources: List[List[Dict[str, Any]]],
+    writers: Dict[int, Tuple[PageWriter, PageWriter]],
+    batch_size: int,
+    on_batch: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None
+):
+    """
+    Stream per-network transaction lists oldest-first into their network's
+    (transactions, claims) page writers, keyed by chainId. Each batch goes to
+    on_batch (indexer, snapshot, rollups) before its records are paged. The
+    writers are not flushed; closing them writes the manifests.
+    """
+    for batch in batched(normalize(merge_by_timestamp(sources)), batch_size):
+        if on_batch is not None:
+            await on_batch(batch)
+        for tx in batch:
+            transactions_writer, claims_writer = writers[tx["chainId"]]
+            await transactions_writer.add(tx)
+            if is_claim(tx):
+                await claims_writer.add(tx)
+
+
+# ----------------------------------------------------------------------
+# Memory benchmark
+# ----------------------------------------------------------------------
+
+BENCHMARK_NETWORKS = [(42220, "Celo"), (8453, "Base"), (42161, "Arbitrum"), (1135, "Lisk")]
+
+
+def synthetic_network(chain_id: int, network_name: str, n: int) -> List[Dict[str, Any]]:
+    """One network's transactions, materialized as the fetch stage returns them"""
+    return [
+        {
+            "id": f"{chain_id}:0xfactory:{i}",
+            "faucetAddress": f"0x{i % 2000:040x}",
+            "transactionType": "claim" if i % 3 else "fund",
+            "initiator": f"0x{(i * 7919) % 200_000:040x}",
+            "amount": 10**18,
+            "isEther": False,
+            "timestamp": 1_700_000_000 + i * 30,
+            "networkName": network_name,
+            "chainId": chain_id,
+            "factoryAddress": "0xfactory",
+            "txIndex": i,
+            "tokenSymbol": "TKN",
+            "tokenDecimals": 18
+        }
+        for i in range(n)
+    ]
+
+
+def fetched_networks(n: int) -> List[List[Dict[str, Any]]]:
+    per_network = n // len(BENCHMARK_NETWORKS)
+    return [synthetic_network(chain_id, name, per_network) for chain_id, name in BENCHMARK_NETWORKS]
+
+
+async def discard_page(key: str, page: Dict[str, Any]) -> bool:
+    return True
+
+
+async def list_based_persist(n: int, chunk_size: int):
+    """The previous shape: concatenated history, sorted copy, claims copy, every page encoded up front"""
+    all_transactions = []
+    for transactions in fetched_networks(n):
+        all_transactions.extend(transactions)
+    all_transactions = sorted(all_transactions, key=timestamp_of)
+    for tx in all_transactions:
+        tx["amount"] = str(tx["amount"])
+    all_claims = [tx for tx in all_transactions if is_claim(tx)]
+    pages = [encode_page(page) for page in split_pages(all_transactions, chunk_size)]
+    pages += [encode_page(page) for page in split_pages(all_claims, chunk_size)]
+    for index, page in enumerate(pages):
+        await discard_page(str(index), page)
+
+
+async def streaming_persist(n: int, chunk_size: int):
+    """The refresh's persist step, fed the same fetched lists"""
+    writers = {
+        chain_id: (
+            PageWriter(f"transactions:{chain_id}", chunk_size, [], discard_page),
+            PageWriter(f"claims:{chain_id}", chunk_size, [], discard_page)
+        )
+        for chain_id, _ in BENCHMARK_NETWORKS
+    }
+    await persist_transactions(fetched_networks(n), writers, chunk_size)
+    for transactions_writer, claims_writer in writers.values():
+        await transactions_writer.flush()
+        await claims_writer.flush()
+
+
+def peak_mib(run) -> float:
+    tracemalloc.start()
+    asyncio.run(run)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+async def fetch_only(n: int, chunk_size: int):
+    fetched_networks(n)
+
+
+def benchmark(sizes=(25_000, 50_000, 100_000, 200_000), chunk_size: int = 5000):
+    """Peak MiB; the persist columns include the fetched lists (see 'fetched')"""
+    print(f"{'records':>10} {'fetched MiB':>12} {'list-based MiB':>16} {'streaming MiB':>15}")
+    for n in sizes:
+        print(
+            f"{n:>10,} {peak_mib(fetch_only(n, chunk_size)):>12.1f}"
+            f" {peak_mib(list_based_persist(n, chunk_size)):>16.1f}"
+            f" {peak_mib(streaming_persist(n, chunk_size)):>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
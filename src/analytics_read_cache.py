@@ -0,0 +1,79 @@
+"""
+In-process read cache for the `/analytics/*` GET endpoints.
+
+Analytics payloads only change when a refresh finishes, so each worker keeps
+the serialized response body per URL, tagged with the dataset version it was
+built from. `invalidate()` (called when update_all_analytics_data completes)
+bumps the version; entries also expire after `ttl` seconds so workers that
+did not run the refresh pick up new data. A payload built while a refresh
+finished is served but not stored, since it may predate the new data.
+
+Responses carry a strong ETag (hash of the body) and Cache-Control, and a
+matching If-None-Match gets an empty 304.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+
+class AnalyticsReadCache:
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version = 0
+        self.entries: "OrderedDict[str, Tuple[int, float, bytes, str]]" = OrderedDict()
+
+    def invalidate(self):
+        self.version += 1
+        self.entries.clear()
+
+    def cache_control(self) -> str:
+        return f"public, max-age={int(self.ttl)}, must-revalidate"
+
+    def lookup(self, key: str):
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        version, stored_at, body, etag = entry
+        if version != self.version or time.monotonic() - stored_at > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return body, etag
+
+    def store(self, key: str, payload: Dict[str, Any], version: int) -> Tuple[bytes, str]:
+        body = json.dumps(payload, default=str, separators=(",", ":")).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        if version != self.version:
+            # Invalidated while building
+            return body, etag
+        self.entries[key] = (version, time.monotonic(), body, etag)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return body, etag
+
+    async def respond(self, request: Request, build: Callable[[], Awaitable[Dict[str, Any]]]) -> Response:
+        """
+        Serve request from the cache, building the payload on a miss. Payloads
+        without success=True (e.g. "no cached data yet") are returned uncached.
+        """
+        key = str(request.url.path) + "?" + str(request.url.query)
+        cached = self.lookup(key)
+        if cached is None:
+            version = self.version
+            payload = await build()
+            if not payload.get("success"):
+                return JSONResponse(payload)
+            cached = self.store(key, payload, version)
+
+        body, etag = cached
+        headers = {"ETag": etag, "Cache-Control": self.cache_control()}
+        if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,267 @@
+"""
+Materialized analytics rollups, maintained incrementally.
+
+Each refresh hands the rollups the transactions it fetched; only the ones
+past the per-factory cursor (i.e. TransactionRecorded entries appended since
+the last refresh) are aggregated, as one vectorized batch, and merged into:
+
+    hourly / daily buckets   transactions, claims (+ new / unique claimers per day)
+    faucets                  claims, volume, latest claim, token info
+    networks                 transactions, claims, factories
+    totals                   transactions, claims, unique claimers
+
+The dashboard and chart payloads are built from these O(buckets) counters
+rather than from the raw claim history. Distinct claimers per day, faucet and
+network are tracked with HyperLogLog sketches (see analytics_sketch), so
+unique counts can be answered for any range of days by merging sketches.
+
+New claimers per day and the all-time unique claimer total are exact: the
+state keeps each wallet's first claim day, and a wallet whose earlier claim
+arrives later (another network, a late batch) is moved to that day.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .analytics_columns import SECONDS_PER_DAY, TransactionColumns, day_labels
+from .analytics_sketch import HyperLogLog, merged
+
+SECONDS_PER_HOUR = 3600
+# Bumped when the state layout changes; older state is dropped and rebuilt
+ROLLUP_STATE_VERSION = 2
+
+
+def hour_labels(hours: np.ndarray) -> List[str]:
+    """Hour numbers since epoch -> 'YYYY-MM-DDTHH:00Z'"""
+    return [label + ":00Z" for label in np.datetime_as_string(hours.astype('datetime64[h]'), unit='h').tolist()]
+
+
+def bump(counters: Dict[str, Any], field: str, amount: Any):
+    counters[field] = counters.get(field, 0) + amount
+
+
+class AnalyticsRollups:
+    def __init__(self, rollups: Dict[str, Any] = None, state: Dict[str, Any] = None):
+        if state and state.get("version") != ROLLUP_STATE_VERSION:
+            # Cursors reset with it, so the next refresh re-aggregates the full history
+            print("⚠️ Rollup state is from an older version, rebuilding rollups")
+            rollups = state = None
+        rollups = rollups or {}
+        state = state or {}
+        # Nothing aggregated yet: the caller has to feed every network's history
+        self.from_scratch = not state
+        self.hourly: Dict[str, Dict[str, int]] = rollups.get("hourly", {})
+        self.daily: Dict[str, Dict[str, int]] = rollups.get("daily", {})
+        self.faucets: Dict[str, Dict[str, Any]] = rollups.get("faucets", {})
+        self.networks: Dict[str, Dict[str, Any]] = rollups.get("networks", {})
+        self.totals: Dict[str, int] = rollups.get("totals", {"transactions": 0, "claims": 0, "uniqueClaimers": 0})
+
+        # Pipeline-only state, stored separately from the public rollups
+        self.cursors: Dict[str, int] = state.get("cursors", {})
+        # Wallet -> UTC day number of its first claim
+        self.first_claim_days: Dict[str, int] = state.get("firstClaimDays", {})
+        self.claimers_by_day = self.load_sketches(state.get("claimersByDay", {}))
+        self.claimers_by_faucet = self.load_sketches(state.get("claimersByFaucet", {}))
+        self.claimers_by_network = self.load_sketches(state.get("claimersByNetwork", {}))
+
+    @staticmethod
+    def load_sketches(encoded: Dict[str, str]) -> Dict[str, HyperLogLog]:
+        return {key: HyperLogLog.from_string(value) for key, value in encoded.items()}
+
+    @staticmethod
+    def dump_sketches(sketches: Dict[str, HyperLogLog]) -> Dict[str, str]:
+        return {key: sketch.to_string() for key, sketch in sketches.items()}
+
+    def rollups_dict(self) -> Dict[str, Any]:
+        return {
+            "hourly": self.hourly,
+            "daily": self.daily,
+            "faucets": self.faucets,
+            "networks": self.networks,
+            "totals": self.totals
+        }
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "version": ROLLUP_STATE_VERSION,
+            "cursors": self.cursors,
+            "firstClaimDays": self.first_claim_days,
+            "claimersByDay": self.dump_sketches(self.claimers_by_day),
+            "claimersByFaucet": self.dump_sketches(self.claimers_by_faucet),
+            "claimersByNetwork": self.dump_sketches(self.claimers_by_network)
+        }
+
+    def unique_claimers(self, start: Optional[str] = None, end: Optional[str] = None) -> int:
+        """Estimated distinct claimers over a day range ('YYYY-MM-DD', inclusive)"""
+        return merged(
+            sketch for day, sketch in self.claimers_by_day.items()
+            if (not start or day >= start) and (not end or day <= end)
+        ).count()
+
+    def new_transactions(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Transactions past the per-factory cursor, advancing the cursors"""
+        fresh = []
+        next_cursors = dict(self.cursors)
+        for tx in transactions:
+            if "txIndex" not in tx:
+                continue
+            factory_key = f"{tx['chainId']}:{tx['factoryAddress'].lower()}"
+            if tx["txIndex"] < self.cursors.get(factory_key, 0):
+                continue
+            fresh.append(tx)
+            next_cursors[factory_key] = max(next_cursors.get(factory_key, 0), tx["txIndex"] + 1)
+        self.cursors = next_cursors
+        return fresh
+
+    def apply(self, transactions: List[Dict[str, Any]]) -> int:
+        """Fold newly recorded transactions into the rollups; returns how many were new"""
+        fresh = self.new_transactions(transactions)
+        if fresh:
+            self.merge_delta(build_rollup_delta(fresh))
+        return len(fresh)
+
+    def merge_delta(self, delta: Dict[str, Any]):
+        """Merge a batch aggregate from build_rollup_delta (cheap: O(buckets + keys))"""
+        for name, buckets in [("hourly", self.hourly), ("daily", self.daily)]:
+            for label, counters in delta[name].items():
+                bucket = buckets.setdefault(label, {"transactions": 0, "claims": 0})
+                for field, count in counters.items():
+                    bump(bucket, field, count)
+
+        for network in delta["networks"]:
+            entry = self.networks.setdefault(network["name"], {
+                "chainId": network["chainId"],
+                "transactions": 0,
+                "claims": 0,
+                "factoryAddresses": []
+            })
+            entry["transactions"] += network["totalTransactions"]
+            entry["claims"] += network["claims"]
+            for factory in network["factoryAddresses"]:
+                if factory not in entry["factoryAddresses"]:
+                    entry["factoryAddresses"].append(factory)
+
+        for faucet in delta["faucets"]:
+            entry = self.faucets.setdefault(faucet["faucetAddress"], {
+                "network": faucet["network"],
+                "chainId": faucet["chainId"],
+                "claims": 0,
+                "volume": "0",
+                "tokenSymbol": faucet["tokenSymbol"],
+                "tokenDecimals": faucet["tokenDecimals"],
+                "latestTimestamp": 0
+            })
+            entry["claims"] += faucet["claims"]
+            # uint256 sums are kept as decimal strings so JSON can't truncate them
+            entry["volume"] = str(int(entry["volume"]) + int(faucet["totalAmount"]))
+            entry["latestTimestamp"] = max(entry["latestTimestamp"], faucet["latestTimestamp"])
+
+        self.merge_claimers(delta["claimers"])
+        self.merge_first_claims(delta["firstClaimDays"])
+
+        bump(self.totals, "transactions", delta["transactions"])
+        bump(self.totals, "claims", delta["claims"])
+
+    def merge_claimers(self, claimers: Dict[str, Dict[str, HyperLogLog]]):
+        """Estimated unique claimers per day / faucet / network"""
+        for key, sketches in [
+            ("day", self.claimers_by_day),
+            ("faucet", self.claimers_by_faucet),
+            ("network", self.claimers_by_network)
+        ]:
+            for name, sketch in claimers[key].items():
+                sketches.setdefault(name, HyperLogLog()).merge(sketch)
+
+        for day in claimers["day"]:
+            self.daily[day]["uniqueClaimers"] = self.claimers_by_day[day].count()
+        for faucet in claimers["faucet"]:
+            self.faucets[faucet]["uniqueClaimers"] = self.claimers_by_faucet[faucet].count()
+        for network in claimers["network"]:
+            self.networks[network]["uniqueClaimers"] = self.claimers_by_network[network].count()
+
+    def merge_first_claims(self, first_claim_days: Dict[str, int]):
+        """Exact new claimers per day: each wallet counts once, on its earliest claim day"""
+        changes: Dict[int, int] = {}
+        for wallet, day in first_claim_days.items():
+            previous = self.first_claim_days.get(wallet)
+            if previous is not None and previous <= day:
+                continue
+            self.first_claim_days[wallet] = day
+            changes[day] = changes.get(day, 0) + 1
+            if previous is not None:
+                changes[previous] = changes.get(previous, 0) - 1
+
+        days = sorted(changes)
+        for label, day in zip(day_labels(np.array(days, dtype=np.int64)), days):
+            bucket = self.daily.setdefault(label, {"transactions": 0, "claims": 0})
+            bump(bucket, "newClaimers", changes[day])
+        self.totals["uniqueClaimers"] = len(self.first_claim_days)
+
+
+def build_rollup_delta(transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate one batch of new transactions. Pure and picklable both ways, so
+    main.py can run it in a worker process and merge the result on the loop.
+    """
+    batch = TransactionColumns.from_records(transactions)
+    claims = batch.claims()
+
+    delta: Dict[str, Any] = {"transactions": len(batch), "claims": len(claims)}
+
+    for name, seconds, to_labels in [
+        ("hourly", SECONDS_PER_HOUR, hour_labels),
+        ("daily", SECONDS_PER_DAY, day_labels),
+    ]:
+        buckets: Dict[str, Dict[str, int]] = {}
+        for field, timestamps in [("transactions", batch.timestamps), ("claims", claims.timestamps)]:
+            keys, counts = np.unique(timestamps // seconds, return_counts=True)
+            for label, count in zip(to_labels(keys), counts.tolist()):
+                buckets.setdefault(label, {"transactions": 0, "claims": 0})[field] = count
+        delta[name] = buckets
+
+    claim_counts = dict(zip(claims.networks.labels, claims.networks.counts().tolist()))
+    delta["networks"] = [
+        {**network, "claims": claim_counts.get(network["name"], 0)}
+        for network in batch.per_network()
+    ]
+    delta["faucets"] = claims.per_faucet()
+    delta["claimers"] = claimer_sketches(claims)
+    user_codes, first_days = claims.first_day_per_initiator()
+    delta["firstClaimDays"] = {
+        claims.initiators.labels[code]: day
+        for code, day in zip(user_codes.tolist(), first_days.tolist())
+    }
+    return delta
+
+
+def claimer_sketches(claims: TransactionColumns) -> Dict[str, Dict[str, HyperLogLog]]:
+    """Batch-local HyperLogLog sketches of claimers per day / faucet / network"""
+    valid = claims.valid_initiator_mask()
+    days = claims.days()
+    day_names = dict(zip(np.unique(days).tolist(), day_labels(np.unique(days))))
+
+    # Distinct (claimer, day, faucet, network) tuples only, not every claim
+    grouped: Dict[str, Dict[str, set]] = {"day": {}, "faucet": {}, "network": {}}
+    keys = np.stack([claims.initiators.codes, days, claims.faucets.codes, claims.networks.codes], axis=1)
+    for user_code, day, faucet_code, network_code in np.unique(keys, axis=0).tolist():
+        if not valid[user_code]:
+            continue
+        user = claims.initiators.labels[user_code]
+        grouped["day"].setdefault(day_names[day], set()).add(user)
+        grouped["faucet"].setdefault(claims.faucets.labels[faucet_code], set()).add(user)
+        grouped["network"].setdefault(claims.networks.labels[network_code], set()).add(user)
+
+    sketches: Dict[str, Dict[str, HyperLogLog]] = {}
+    for key, groups in grouped.items():
+        sketches[key] = {}
+        for name, users in groups.items():
+            sketch = HyperLogLog()
+            sketch.add_many(users)
+            sketches[key][name] = sketch
+    return sketches
+
+
+def rollup_state_json(rollups: AnalyticsRollups) -> str:
+    """Serialized pipeline state (sketch encoding is the expensive part)"""
+    return json.dumps(rollups.state_dict())
@@ -0,0 +1,188 @@
+"""
+In-app analytics scheduler and the cross-worker lease it runs under.
+
+Every uvicorn worker starts an AnalyticsScheduler from the app lifespan, but a
+refresh only runs while holding the `analytics_refresh` lease, so exactly one
+worker does the RPC work at a time:
+
+    Postgres    try_acquire_analytics_lease / release_analytics_lease RPCs
+                (supabase/migrations/..._analytics_leases.sql); a lease expires
+                on its own if the holder dies mid-refresh, and long jobs renew
+                it every ttl/3 until they release it
+    local       fcntl file lock in the temp dir, used when the RPC functions
+                are not installed (single-host deployments, local development);
+                any other RPC error counts as not acquired
+
+Intervals come from the environment, e.g.
+
+    ANALYTICS_DATASET_INTERVALS="analytics=300,token_metadata=86400"
+    ANALYTICS_NETWORK_INTERVALS="42220=120,1135=900"
+
+Each entry becomes a job; a non-positive interval disables it.
+"""
+import asyncio
+import os
+import socket
+import tempfile
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the Postgres lease only
+    fcntl = None
+
+
+def is_missing_function(error: Exception) -> bool:
+    """PostgREST / Postgres error for an RPC whose function is not installed"""
+    if getattr(error, "code", None) in ("PGRST202", "42883"):
+        return True
+    message = str(error).lower()
+    return "could not find the function" in message or ("function" in message and "does not exist" in message)
+
+
+def parse_intervals(spec: Optional[str]) -> Dict[str, float]:
+    """'name=seconds,name=seconds' -> {name: seconds}"""
+    intervals = {}
+    for entry in (spec or "").split(","):
+        if "=" not in entry:
+            continue
+        name, seconds = entry.split("=", 1)
+        try:
+            intervals[name.strip()] = float(seconds)
+        except ValueError:
+            print(f"⚠️ Ignoring invalid analytics interval: {entry!r}")
+    return intervals
+
+
+class LeaseLock:
+    """Named lease shared by all workers (Postgres), with a file lock stand-in"""
+
+    def __init__(self, supabase_client, lock_dir: Optional[str] = None):
+        self.supabase = supabase_client
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lock_dir = lock_dir or tempfile.gettempdir()
+        self.file_handles: Dict[str, int] = {}
+        self.renewals: Dict[str, asyncio.Task] = {}
+
+    async def acquire(self, name: str, ttl_seconds: int, renew: bool = False) -> bool:
+        """
+        With renew=True the lease is extended every ttl/3 until release(), for
+        jobs that may outlive the ttl.
+        """
+        try:
+            acquired = await self.try_acquire(name, ttl_seconds)
+        except Exception as e:
+            if not is_missing_function(e):
+                # Postgres is there but failing: another worker may hold the lease
+                print(f"⚠️ Lease RPC failed for {name}: {str(e)}")
+                return False
+            print(f"⚠️ Lease RPC unavailable ({str(e)}), using local file lock for {name}")
+            return self.acquire_file_lock(name)
+        if acquired and renew and name not in self.renewals:
+            self.renewals[name] = asyncio.create_task(self.keep_renewed(name, ttl_seconds))
+        return acquired
+
+    async def try_acquire(self, name: str, ttl_seconds: int) -> bool:
+        # Re-entrant for this holder: calling it again extends the lease
+        response = await asyncio.to_thread(
+            lambda: self.supabase.rpc("try_acquire_analytics_lease", {
+                "p_name": name,
+                "p_holder": self.holder,
+                "p_ttl_seconds": ttl_seconds
+            }).execute()
+        )
+        return bool(response.data)
+
+    async def keep_renewed(self, name: str, ttl_seconds: int):
+        while True:
+            await asyncio.sleep(ttl_seconds / 3)
+            try:
+                if not await self.try_acquire(name, ttl_seconds):
+                    print(f"⚠️ Lease {name} was taken over; no longer renewing it")
+                    return
+            except Exception as e:
+                # Try again next round; the lease is still valid for 2/3 of the ttl
+                print(f"⚠️ Failed to renew lease {name}: {str(e)}")
+
+    async def release(self, name: str):
+        renewal = self.renewals.pop(name, None)
+        if renewal:
+            renewal.cancel()
+        if name in self.file_handles:
+            self.release_file_lock(name)
+            return
+        try:
+            await asyncio.to_thread(
+                lambda: self.supabase.rpc("release_analytics_lease", {
+                    "p_name": name,
+                    "p_holder": self.holder
+                }).execute()
+            )
+        except Exception as e:
+            # The lease still expires on its own
+            print(f"⚠️ Failed to release lease {name}: {str(e)}")
+
+    def acquire_file_lock(self, name: str) -> bool:
+        if fcntl is None:
+            return True
+        if name in self.file_handles:
+            return False
+        fd = os.open(os.path.join(self.lock_dir, f"faucetdrop-{name}.lock"), os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self.file_handles[name] = fd
+        return True
+
+    def release_file_lock(self, name: str):
+        fd = self.file_handles.pop(name)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+class AnalyticsScheduler:
+    """Runs named jobs on fixed intervals from a single background task"""
+
+    def __init__(self, tick_seconds: float = 5.0):
+        self.tick_seconds = tick_seconds
+        self.jobs: Dict[str, Dict] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def add_job(self, name: str, interval: float, run: Callable[[], Awaitable]):
+        if interval <= 0:
+            print(f"⏸️ Analytics job {name} disabled")
+            return
+        # First run one interval after startup; manual updates cover cold starts
+        self.jobs[name] = {"interval": interval, "run": run, "next_run": time.monotonic() + interval}
+
+    def start(self):
+        if self.jobs and self.task is None:
+            self.task = asyncio.create_task(self.loop())
+            schedule = ", ".join(f"{name}={job['interval']:g}s" for name, job in self.jobs.items())
+            print(f"🕐 Analytics scheduler started: {schedule}")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def loop(self):
+        while True:
+            now = time.monotonic()
+            for name, job in self.jobs.items():
+                if now < job["next_run"]:
+                    continue
+                job["next_run"] = now + job["interval"]
+                try:
+                    await job["run"]()
+                except Exception as e:
+                    print(f"❌ Scheduled analytics job {name} failed: {str(e)}")
+            await asyncio.sleep(self.tick_seconds)
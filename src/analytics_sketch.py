@@ -0,0 +1,83 @@
+"""
+HyperLogLog sketches for distinct-claimer counts.
+
+A sketch is a fixed array of 2**precision one-byte registers, so unique-user
+metrics per day / faucet / network take bounded memory no matter how many
+wallets claim. Sketches with the same precision merge by register-wise max,
+which is how counts over arbitrary day ranges are answered.
+
+At the default precision (12, 4096 registers) the standard error is ~1.6%.
+Sketches are stored in `analytics_cache` as base64 of the zlib-compressed
+registers; sparse sketches compress to a few hundred bytes.
+"""
+import base64
+import hashlib
+import zlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+DEFAULT_PRECISION = 12
+MASK64 = (1 << 64) - 1
+
+
+def hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[np.ndarray] = None):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = registers if registers is not None else np.zeros(self.m, dtype=np.uint8)
+
+    def add_many(self, values: Iterable[str]):
+        indexes, ranks = [], []
+        for value in values:
+            h = hash64(value)
+            indexes.append(h >> (64 - self.precision))
+            # Rank = position of the leftmost 1-bit in the remaining 64-p bits
+            remainder = (h << self.precision) & MASK64
+            ranks.append(64 - remainder.bit_length() + 1 if remainder else 64 - self.precision + 1)
+        if indexes:
+            np.maximum.at(self.registers, np.array(indexes, dtype=np.int64), np.array(ranks, dtype=np.uint8))
+
+    def add(self, value: str):
+        self.add_many([value])
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def copy(self) -> "HyperLogLog":
+        return HyperLogLog(self.precision, self.registers.copy())
+
+    def count(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+
+        # Small-range correction: linear counting while registers are still empty
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and empty:
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+    def to_string(self) -> str:
+        raw = bytes([self.precision]) + self.registers.tobytes()
+        return base64.b64encode(zlib.compress(raw, 6)).decode()
+
+    @classmethod
+    def from_string(cls, encoded: str) -> "HyperLogLog":
+        raw = zlib.decompress(base64.b64decode(encoded))
+        return cls(raw[0], np.frombuffer(raw[1:], dtype=np.uint8).copy())
+
+
+def merged(sketches: Iterable[HyperLogLog]) -> HyperLogLog:
+    """Union of several sketches (an empty sketch if there are none)"""
+    result = None
+    for sketch in sketches:
+        result = sketch.copy() if result is None else result.merge(sketch)
+    return result or HyperLogLog()
@@ -0,0 +1,246 @@
+"""
+Local, memory-mapped columnar snapshot of the normalized transaction history.
+
+Layout (ANALYTICS_SNAPSHOT_DIR):
+
+    meta.json        committed row count + per-factory cursors
+    labels.json      label lists of the categorical columns (append-only)
+    <column>.bin     raw little-endian values, one file per column
+
+Column files are append-only; `meta.json` is replaced atomically after the
+bytes are written, so readers only ever map the committed prefix and a crash
+mid-append leaves a tail that the next append truncates. Plain `.bin` files
+(rather than `.npy`) keep appends header-free; np.memmap gives the same
+zero-copy view, shared through the page cache by every worker on the host.
+"""
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .analytics_columns import Categorical, TransactionColumns
+
+NUMERIC_COLUMNS = {
+    "timestamp": np.dtype("<i8"),
+    "chain_id": np.dtype("<i8"),
+    "tx_index": np.dtype("<i8"),
+    "token_decimals": np.dtype("<i2"),
+    "is_ether": np.dtype("?"),
+    "amount": np.dtype("S32"),  # uint256, little-endian bytes (NumPy strips trailing NULs = high zeros)
+}
+
+# column -> transaction dict field; stored as int32 codes into labels.json
+CATEGORICAL_COLUMNS = {
+    "faucet": "faucetAddress",
+    "initiator": "initiator",
+    "network": "networkName",
+    "factory": "factoryAddress",
+    "transaction_type": "transactionType",
+    "token_symbol": "tokenSymbol",
+}
+CODE_DTYPE = np.dtype("<i4")
+
+
+def amount_bytes(amount: Any) -> bytes:
+    value = int(amount) if isinstance(amount, str) and amount.isdigit() else int(amount or 0)
+    return value.to_bytes(32, "little")
+
+
+def amount_value(raw: bytes) -> int:
+    return int.from_bytes(bytes(raw).ljust(32, b"\0"), "little")
+
+
+class ColumnarSnapshot:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.meta_mtime = None
+        self.load()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def read_json(self, name: str, default: Any) -> Any:
+        try:
+            with open(self.path(name)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return default
+
+    def write_json(self, name: str, data: Any):
+        tmp = self.path(name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path(name))
+
+    def load(self):
+        """Map the committed prefix of every column"""
+        meta = self.read_json("meta.json", {"rows": 0, "cursors": {}})
+        self.rows: int = meta["rows"]
+        self.cursors: Dict[str, int] = meta["cursors"]
+        self.labels: Dict[str, List[str]] = self.read_json("labels.json", {c: [] for c in CATEGORICAL_COLUMNS})
+        self.lookups = {c: {label: i for i, label in enumerate(self.labels.get(c, []))} for c in CATEGORICAL_COLUMNS}
+        self.pending_rows = 0
+
+        self.columns: Dict[str, np.ndarray] = {}
+        dtypes = {**NUMERIC_COLUMNS, **{c: CODE_DTYPE for c in CATEGORICAL_COLUMNS}}
+        for column, dtype in dtypes.items():
+            if self.rows == 0:
+                self.columns[column] = np.empty(0, dtype=dtype)
+            else:
+                self.columns[column] = np.memmap(self.path(f"{column}.bin"), dtype=dtype, mode="r", shape=(self.rows,))
+
+        try:
+            self.meta_mtime = os.stat(self.path("meta.json")).st_mtime_ns
+        except FileNotFoundError:
+            self.meta_mtime = None
+
+    def refresh(self):
+        """Re-map if another worker committed new rows since we loaded"""
+        try:
+            mtime = os.stat(self.path("meta.json")).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self.meta_mtime:
+            self.load()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    # ------------------------------------------------------------------
+    # Writing (only the worker holding the analytics lease appends)
+    # ------------------------------------------------------------------
+
+    def shared_rows(self) -> int:
+        """Row count in the committed header, which may be ahead of this worker's map"""
+        return self.read_json("meta.json", {"rows": 0})["rows"]
+
+    def append(self, transactions: List[Dict[str, Any]]) -> int:
+        """
+        Append transactions past the per-factory cursors; visible after commit().
+        Call while holding the analytics lease: the first append of a refresh
+        re-maps whatever another worker committed since this one last loaded.
+        """
+        if not self.pending_rows:
+            self.refresh()
+        if self.shared_rows() != self.rows:
+            raise RuntimeError("Snapshot was committed by another writer mid-append")
+
+        new = []
+        for tx in transactions:
+            if "txIndex" not in tx:
+                continue
+            factory_key = f"{tx['chainId']}:{tx['factoryAddress'].lower()}"
+            if tx["txIndex"] < self.cursors.get(factory_key, 0):
+                continue
+            new.append(tx)
+            self.cursors[factory_key] = tx["txIndex"] + 1
+        if not new:
+            return 0
+
+        values = {
+            "timestamp": np.array([tx["timestamp"] for tx in new], dtype=NUMERIC_COLUMNS["timestamp"]),
+            "chain_id": np.array([tx["chainId"] for tx in new], dtype=NUMERIC_COLUMNS["chain_id"]),
+            "tx_index": np.array([tx["txIndex"] for tx in new], dtype=NUMERIC_COLUMNS["tx_index"]),
+            "token_decimals": np.array([tx.get("tokenDecimals", 18) for tx in new], dtype=NUMERIC_COLUMNS["token_decimals"]),
+            "is_ether": np.array([bool(tx.get("isEther")) for tx in new], dtype=NUMERIC_COLUMNS["is_ether"]),
+            "amount": np.array([amount_bytes(tx.get("amount")) for tx in new], dtype=NUMERIC_COLUMNS["amount"]),
+        }
+        for column, field in CATEGORICAL_COLUMNS.items():
+            lookup, labels = self.lookups[column], self.labels.setdefault(column, [])
+            codes = []
+            for tx in new:
+                label = tx.get(field) or ""
+                if label not in lookup:
+                    lookup[label] = len(labels)
+                    labels.append(label)
+                codes.append(lookup[label])
+            values[column] = np.array(codes, dtype=CODE_DTYPE)
+
+        written = self.rows + self.pending_rows
+        for column, array in values.items():
+            with open(self.path(f"{column}.bin"), "ab+") as f:
+                size = f.seek(0, os.SEEK_END)
+                expected = written * array.dtype.itemsize
+                if size < expected:
+                    raise RuntimeError(f"{column}.bin is shorter than its committed rows")
+                if size > expected:
+                    # Drop a tail left by a crash before the last commit; never
+                    # below the committed rows other workers have mapped
+                    f.truncate(expected)
+                    f.seek(0, os.SEEK_END)
+                f.write(array.tobytes())
+        self.pending_rows += len(new)
+        return len(new)
+
+    def commit(self):
+        """Publish appended rows: labels first, then the row count readers map"""
+        if not self.pending_rows:
+            return
+        if self.shared_rows() != self.rows:
+            raise RuntimeError("Snapshot was committed by another writer mid-append")
+        for column in NUMERIC_COLUMNS.keys() | CATEGORICAL_COLUMNS.keys():
+            with open(self.path(f"{column}.bin"), "rb+") as f:
+                os.fsync(f.fileno())
+        self.write_json("labels.json", self.labels)
+        self.write_json("meta.json", {"rows": self.rows + self.pending_rows, "cursors": self.cursors})
+        self.load()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def covers_chain(self, chain_id: int, factory_addresses: List[str]) -> bool:
+        """True if every factory of the chain has been ingested from its first transaction"""
+        return bool(factory_addresses) and all(
+            f"{chain_id}:{factory.lower()}" in self.cursors for factory in factory_addresses
+        )
+
+    def chain_mask(self, chain_ids: List[int]) -> np.ndarray:
+        return np.isin(self.columns["chain_id"], np.asarray(chain_ids, dtype=np.int64))
+
+    def records(self, mask: Optional[np.ndarray] = None) -> Iterator[Dict[str, Any]]:
+        """Transaction dicts in the fetcher's shape, materialized one row at a time"""
+        rows = np.flatnonzero(mask) if mask is not None else range(self.rows)
+        cols, labels = self.columns, self.labels
+        for row in rows:
+            chain_id = int(cols["chain_id"][row])
+            factory = labels["factory"][cols["factory"][row]]
+            tx_index = int(cols["tx_index"][row])
+            yield {
+                "id": f"{chain_id}:{factory.lower()}:{tx_index}",
+                "faucetAddress": labels["faucet"][cols["faucet"][row]],
+                "transactionType": labels["transaction_type"][cols["transaction_type"][row]],
+                "initiator": labels["initiator"][cols["initiator"][row]],
+                "amount": str(amount_value(cols["amount"][row])),
+                "isEther": bool(cols["is_ether"][row]),
+                "timestamp": int(cols["timestamp"][row]),
+                "networkName": labels["network"][cols["network"][row]],
+                "chainId": chain_id,
+                "factoryAddress": factory,
+                "txIndex": tx_index,
+                "tokenSymbol": labels["token_symbol"][cols["token_symbol"][row]],
+                "tokenDecimals": int(cols["token_decimals"][row])
+            }
+
+    def transaction_columns(self) -> TransactionColumns:
+        """Zero-copy columnar view for the vectorized group-bys (amounts decoded)"""
+        amounts = np.empty(self.rows, dtype=object)
+        amounts[:] = [amount_value(raw) for raw in self.columns["amount"]]
+        types = self.labels.get("transaction_type", [])
+        claim_codes = np.array(["claim" in t.lower() for t in types], dtype=bool)
+        return TransactionColumns(
+            timestamps=self.columns["timestamp"],
+            amounts=amounts,
+            faucets=Categorical(self.columns["faucet"], [l.lower() for l in self.labels.get("faucet", [])]),
+            initiators=Categorical(self.columns["initiator"], [l.lower() for l in self.labels.get("initiator", [])]),
+            networks=Categorical(self.columns["network"], self.labels.get("network", [])),
+            chain_ids=self.columns["chain_id"],
+            factories=Categorical(self.columns["factory"], self.labels.get("factory", [])),
+            token_symbols=np.array(self.labels.get("token_symbol", []), dtype=object)[self.columns["token_symbol"]] if self.rows else np.empty(0, dtype=object),
+            token_decimals=self.columns["token_decimals"].astype(np.int64),
+            is_claim=claim_codes[self.columns["transaction_type"]] if self.rows else np.empty(0, dtype=bool)
+        )
@@ -0,0 +1,186 @@
+"""
+Chunked, compressed layout for large analytics datasets in `analytics_cache`.
+
+A dataset such as the transaction history is stored as:
+
+    <key>              manifest: summary fields + one entry per page
+    <key>:page:00000   zlib-compressed JSON of records [0, chunk_size)
+    <key>:page:00001   ...
+
+Each manifest page entry carries a digest of the page contents, so a refresh
+only rewrites pages whose records actually changed. PageWriter builds the
+pages from a stream of records; readers fetch the manifest for summaries and
+decode just the pages they need.
+
+Per-network datasets (transactions, claims, faucets) keep one such dataset per
+chain, so refreshing one network never reads or rewrites another's pages:
+
+    <key>:chain:42220              that network's manifest
+    <key>:chain:42220:page:00000   its pages
+    <key>                          combined manifest: every network's page
+                                   entries in order, each with the "key" of
+                                   the network page that holds it
+
+Record-level queries (filters, keyset cursors) go to the indexed
+`analytics_transactions` table instead; the cursor helpers live here too.
+"""
+import base64
+import hashlib
+import json
+import re
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+CHUNK_ENCODING = "zlib+base64"
+# analytics_transactions.id: chain id, factory address, position in getAllTransactions()
+CURSOR_ID = re.compile(r"\d+:0x[0-9a-f]{40}:\d+")
+
+
+def page_key(key: str, page: int) -> str:
+    return f"{key}:page:{page:05d}"
+
+
+def chain_dataset_key(key: str, chain_id: int) -> str:
+    return f"{key}:chain:{chain_id}"
+
+
+def entry_page_key(key: str, entry: Dict[str, Any]) -> str:
+    """Row key of a manifest page entry (combined manifests point at network pages)"""
+    return entry.get("key") or page_key(key, entry["page"])
+
+
+def split_pages(records: List[Any], chunk_size: int) -> List[List[Any]]:
+    return [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+
+
+def encode_page(records: List[Any]) -> Dict[str, Any]:
+    """Compress one page of records; the digest is over the uncompressed JSON"""
+    raw = json.dumps(records, default=str, separators=(",", ":"), sort_keys=True).encode()
+    return {
+        "encoding": CHUNK_ENCODING,
+        "count": len(records),
+        "digest": hashlib.sha256(raw).hexdigest(),
+        "payload": base64.b64encode(zlib.compress(raw, 6)).decode()
+    }
+
+
+def decode_page(page: Dict[str, Any]) -> List[Any]:
+    if page.get("encoding") != CHUNK_ENCODING:
+        raise ValueError(f"Unsupported analytics page encoding: {page.get('encoding')}")
+    return json.loads(zlib.decompress(base64.b64decode(page["payload"])))
+
+
+def decode_page_rows(rows: List[str]) -> List[Any]:
+    """Records of several pages as stored in analytics_cache.data (JSON text), in order"""
+    records = []
+    for row in rows:
+        records.extend(decode_page(json.loads(row)))
+    return records
+
+
+class PageWriter:
+    """
+    Encodes records into pages as they arrive, so a dataset is persisted
+    without ever holding more than one page of records. Pages whose digest
+    matches the previous manifest are not rewritten.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        chunk_size: int,
+        previous_pages: List[Dict[str, Any]],
+        write: Callable[[str, Dict[str, Any]], Awaitable[bool]],
+        encode: Optional[Callable[[List[Any]], Awaitable[Dict[str, Any]]]] = None
+    ):
+        self.key = key
+        self.chunk_size = chunk_size
+        self.previous_pages = previous_pages
+        self.write = write
+        # Optional async encoder, e.g. one that runs encode_page in a worker process
+        self.encode = encode
+        self.buffer: List[Any] = []
+        self.pages: List[Dict[str, Any]] = []
+        self.count = 0
+        self.written = 0
+
+    async def add(self, record: Any):
+        self.buffer.append(record)
+        self.count += 1
+        if len(self.buffer) >= self.chunk_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        index = len(self.pages)
+        records, self.buffer = self.buffer, []
+        encoded = await self.encode(records) if self.encode else encode_page(records)
+        self.pages.append({"page": index, "count": encoded["count"], "digest": encoded["digest"]})
+
+        if index < len(self.previous_pages) and self.previous_pages[index]["digest"] == encoded["digest"]:
+            return
+        if not await self.write(page_key(self.key, index), encoded):
+            raise Exception(f"Failed to store page {index}")
+        self.written += 1
+
+    def stale_page_keys(self) -> List[str]:
+        """Pages left over from a longer previous version"""
+        return [page_key(self.key, index) for index in range(len(self.pages), len(self.previous_pages))]
+
+
+def is_manifest(data: Any) -> bool:
+    return isinstance(data, dict) and "pages" in data and "recordsField" in data
+
+
+def combine_manifests(
+    records_field: str,
+    data: Dict[str, Any],
+    chain_manifests: List[Tuple[str, Dict[str, Any]]],
+    chunk_size: int
+) -> Dict[str, Any]:
+    """Combined manifest over (chain dataset key, manifest) pairs, in the given order"""
+    pages = []
+    chains = []
+    for key, manifest in chain_manifests:
+        for entry in manifest["pages"]:
+            pages.append({
+                "page": len(pages),
+                "count": entry["count"],
+                "digest": entry["digest"],
+                "key": page_key(key, entry["page"])
+            })
+        chains.append({"key": key, "chainId": manifest.get("chainId"), "recordCount": manifest["recordCount"]})
+
+    combined = {field: value for field, value in data.items() if field != records_field}
+    combined.update({
+        "recordsField": records_field,
+        "recordCount": sum(chain["recordCount"] for chain in chains),
+        "chunkSize": chunk_size,
+        "pages": pages,
+        "chains": chains
+    })
+    return combined
+
+
+def encode_cursor(timestamp: int, row_id: str) -> str:
+    """Opaque keyset cursor for the indexed transaction table"""
+    raw = json.dumps({"t": timestamp, "id": row_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Inverse of encode_cursor. Both values end up inside a PostgREST filter
+    string, so anything but a row position (`chainId:factory:index` id,
+    non-negative integer timestamp) is rejected.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        timestamp, row_id = data["t"], data["id"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if type(timestamp) is not int or timestamp < 0 or not isinstance(row_id, str) or not CURSOR_ID.fullmatch(row_id):
+        raise ValueError("Invalid cursor")
+    return {"t": timestamp, "id": row_id}
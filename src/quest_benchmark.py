@@ -0,0 +1,120 @@
+"""
+Latency benchmark for GET /api/quests.
+
+Seed a staging database with N synthetic quests (tasks + participants), then
+time the listing endpoint against a running server:
+
+    python -m src.quest_benchmark --seed-sql 10000 | psql "$STAGING_DB_URL"
+    python -m src.quest_benchmark --url http://localhost:8000 --requests 50
+
+Seeded rows use the `0xbe4c...` address prefix so they are easy to remove:
+
+    python -m src.quest_benchmark --cleanup-sql | psql "$STAGING_DB_URL"
+
+The per-quest (N+1) listing issued 2N+1 queries per request, so its latency
+grew linearly with the table; the quest_summary listing is one query per page
+and should stay flat between 1k and 10k quests.
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_ADDRESS_PREFIX = "0xbe4c"
+
+SEED_SQL = """
+insert into quests (faucet_address, slug, title, description, is_active, is_draft,
+                    reward_pool, creator_address, start_date, end_date, created_at, updated_at)
+select '{prefix}' || lpad(to_hex(i), 36, '0'),
+       'bench-quest-' || i,
+       'Bench quest ' || i,
+       'Synthetic quest for listing benchmarks',
+       i % 4 <> 0,
+       i % 10 = 0,
+       '1000',
+       '0x' || lpad(to_hex(i % 50), 40, '0'),
+       now() - interval '1 day',
+       now() + (i % 30) * interval '1 day',
+       now() - i * interval '1 minute',
+       now()
+from generate_series(1, {count}) as i;
+
+insert into faucet_tasks (faucet_address, tasks, created_at, updated_at)
+select '{prefix}' || lpad(to_hex(i), 36, '0'),
+       (select jsonb_agg(jsonb_build_object('id', 'task-' || t, 'title', 'Task ' || t, 'points', 10))
+          from generate_series(1, 5) as t),
+       now(), now()
+from generate_series(1, {count}) as i;
+
+insert into quest_participants (quest_address, wallet_address, referral_id, points, referral_count, joined_at)
+select '{prefix}' || lpad(to_hex(i), 36, '0'),
+       '0x' || lpad(to_hex(i * 100 + p), 40, '0'),
+       'bench-' || i || '-' || p,
+       0,
+       0,
+       now()
+from generate_series(1, {count}) as i, generate_series(1, 20) as p;
+"""
+
+CLEANUP_SQL = """
+delete from quest_participants where quest_address like '{prefix}%';
+delete from faucet_tasks where faucet_address like '{prefix}%';
+delete from quests where faucet_address like '{prefix}%';
+"""
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def time_listing(url: str, requests: int, params: Optional[Dict] = None) -> Dict[str, float]:
+    samples = []
+    with httpx.Client(base_url=url, timeout=60) as client:
+        client.get("/api/quests", params=params).raise_for_status()  # warm-up
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get("/api/quests", params=params)
+            samples.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+        total = response.json().get("total")
+    return {
+        "total": total,
+        "p50": statistics.median(samples),
+        "p95": percentile(samples, 95),
+        "max": max(samples)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--seed-sql", type=int, metavar="COUNT", help="print seed SQL for COUNT quests and exit")
+    parser.add_argument("--cleanup-sql", action="store_true", help="print SQL removing seeded quests and exit")
+    args = parser.parse_args()
+
+    if args.seed_sql:
+        print(SEED_SQL.format(prefix=BENCH_ADDRESS_PREFIX, count=args.seed_sql))
+        return
+    if args.cleanup_sql:
+        print(CLEANUP_SQL.format(prefix=BENCH_ADDRESS_PREFIX))
+        return
+
+    scenarios = {
+        "first page (limit=100)": {"limit": 100},
+        "deep page (offset=5000)": {"limit": 100, "offset": 5000},
+        "active only": {"active": "true", "limit": 100},
+        "ending within 7 days": {"endingWithinDays": 7, "limit": 100},
+    }
+    print(f"{'scenario':<26} {'total':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, params in scenarios.items():
+        result = time_listing(args.url, args.requests, params)
+        print(f"{name:<26} {result['total']:>7} {result['p50']:>8.1f} {result['p95']:>8.1f} {result['max']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+In-process cache of assembled quest detail payloads.
+
+GET /api/quests/{faucetAddress} and GET /api/quests/by-slug/{slug} used to
+read the quest row, its tasks and an exact participant count on every view.
+Each worker now keeps the assembled payload (dates formatted, JSON fields
+parsed, tasks attached) keyed by faucet address / draft id, with a slug index
+pointing at the same entry.
+
+    writes          save_quest, save_quest_draft, finalize_quest,
+                    update_quest_details and every faucet_tasks write call
+                    invalidate(); the next read rebuilds the entry
+    participants    the count is kept next to the entry and refreshed in the
+                    background once it is older than `count_ttl`; readers get
+                    the last known value instead of waiting on the count
+    other workers   entries expire after `ttl` seconds, which bounds how long a
+                    worker that did not handle the write can serve it stale
+    racing loads    a load captures generation() before its reads; store()
+                    drops the payload if the quest was invalidated meanwhile
+
+QuestProgressCache does the same for the per-wallet progress read model
+(GET /api/quests/{faucet}/progress/{wallet}), which the frontend polls: point
+awards, submissions and check-ins invalidate the wallet's entry, quest writes
+drop every entry of the quest. A load that raced one of those invalidations is
+not stored either.
+"""
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+
+def cache_key(address_or_id: str) -> str:
+    # Quest rows are written checksummed, lookups arrive in any case
+    return (address_or_id or "").lower()
+
+
+class QuestDetailCache:
+    def __init__(
+        self,
+        count_participants: Callable[[str], Awaitable[int]],
+        ttl: float = 60.0,
+        count_ttl: float = 15.0,
+        max_entries: int = 1024
+    ):
+        self.count_participants = count_participants
+        self.ttl = ttl
+        self.count_ttl = count_ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.slugs: Dict[str, str] = {}
+        self.counts: Dict[str, Tuple[float, int]] = {}
+        self.refreshing: Set[str] = set()
+        self.tasks: Set[asyncio.Task] = set()
+        # Generation of the last invalidate() per key; evicted marks raise `floor`
+        self.clock = 0
+        self.floor = 0
+        self.invalidated: "OrderedDict[str, int]" = OrderedDict()
+
+    def generation(self) -> int:
+        """Capture before loading; pass to store()"""
+        return self.clock
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def lookup(self, address_or_id: str) -> Optional[Dict[str, Any]]:
+        key = cache_key(address_or_id)
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        stored_at, quest = entry
+        if time.monotonic() - stored_at > self.ttl:
+            self.drop(key)
+            return None
+        self.entries.move_to_end(key)
+        return self.with_participants(key, quest)
+
+    def lookup_slug(self, slug: str) -> Optional[Dict[str, Any]]:
+        key = self.slugs.get(slug)
+        return self.lookup(key) if key else None
+
+    def with_participants(self, key: str, quest: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of the cached payload with the current participant count"""
+        counted_at, count = self.counts.get(key, (0.0, 0))
+        if time.monotonic() - counted_at > self.count_ttl:
+            self.schedule_count_refresh(key, quest["faucetAddress"])
+        payload = copy.deepcopy(quest)
+        payload["totalParticipants"] = count
+        return payload
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def store(self, quest: Dict[str, Any], participants: int, generation: int) -> Dict[str, Any]:
+        key = cache_key(quest["faucetAddress"])
+        if generation < self.floor or self.invalidated.get(key, 0) > generation:
+            # Invalidated while loading: serve this load once, don't cache it
+            return {**copy.deepcopy(quest), "totalParticipants": participants}
+        self.drop(key)
+        self.entries[key] = (time.monotonic(), quest)
+        self.counts[key] = (time.monotonic(), participants)
+        if quest.get("slug"):
+            self.slugs[quest["slug"]] = key
+        while len(self.entries) > self.max_entries:
+            oldest, _ = next(iter(self.entries.items()))
+            self.drop(oldest)
+        return self.with_participants(key, quest)
+
+    def invalidate(self, *addresses_or_ids: Optional[str]):
+        for address_or_id in addresses_or_ids:
+            if not address_or_id:
+                continue
+            key = cache_key(address_or_id)
+            self.drop(key)
+            self.clock += 1
+            self.invalidated[key] = self.clock
+            self.invalidated.move_to_end(key)
+            while len(self.invalidated) > self.max_entries:
+                _, evicted = self.invalidated.popitem(last=False)
+                self.floor = max(self.floor, evicted)
+
+    def drop(self, key: str):
+        entry = self.entries.pop(key, None)
+        self.counts.pop(key, None)
+        if entry and entry[1].get("slug"):
+            self.slugs.pop(entry[1]["slug"], None)
+
+    def mark_participants_stale(self, address: str):
+        """A participant joined: refresh the count on the next read"""
+        key = cache_key(address)
+        if key in self.counts:
+            self.counts[key] = (0.0, self.counts[key][1])
+
+    # ------------------------------------------------------------------
+    # Background participant counts
+    # ------------------------------------------------------------------
+
+    def schedule_count_refresh(self, key: str, address: str):
+        if key in self.refreshing:
+            return
+        self.refreshing.add(key)
+        task = asyncio.create_task(self.refresh_count(key, address))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def refresh_count(self, key: str, address: str):
+        try:
+            count = await self.count_participants(address)
+            if key in self.entries:
+                self.counts[key] = (time.monotonic(), count)
+        except Exception as e:
+            print(f"⚠️ Participant count refresh failed for {address}: {str(e)}")
+        finally:
+            self.refreshing.discard(key)
+
+
+class QuestProgressCache:
+    def __init__(self, ttl: float = 5.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Generation of the last invalidate() per (quest, wallet) / invalidate_quest()
+        # per (quest, None); evicted marks raise `floor` so they still count
+        self.clock = 0
+        self.floor = 0
+        self.invalidated: "OrderedDict[Tuple[str, Optional[str]], int]" = OrderedDict()
+
+    def generation(self) -> int:
+        """Capture before loading; pass to store()"""
+        return self.clock
+
+    def lookup(self, faucet_address: str, wallet_address: str) -> Optional[Dict[str, Any]]:
+        key = (cache_key(faucet_address), cache_key(wallet_address))
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        stored_at, progress = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return copy.deepcopy(progress)
+
+    def store(self, faucet_address: str, wallet_address: str, progress: Dict[str, Any], generation: int):
+        key = (cache_key(faucet_address), cache_key(wallet_address))
+        if (
+            generation < self.floor
+            or self.invalidated.get(key, 0) > generation
+            or self.invalidated.get((key[0], None), 0) > generation
+        ):
+            # Invalidated while loading: the progress may predate the write
+            return
+        self.entries[key] = (time.monotonic(), copy.deepcopy(progress))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, faucet_address: str, wallet_address: str):
+        key = (cache_key(faucet_address), cache_key(wallet_address))
+        self.entries.pop(key, None)
+        self.mark_invalidated(key)
+
+    def invalidate_quest(self, faucet_address: str):
+        faucet_key = cache_key(faucet_address)
+        for key in [key for key in self.entries if key[0] == faucet_key]:
+            del self.entries[key]
+        self.mark_invalidated((faucet_key, None))
+
+    def mark_invalidated(self, key: Tuple[str, Optional[str]]):
+        self.clock += 1
+        self.invalidated[key] = self.clock
+        self.invalidated.move_to_end(key)
+        while len(self.invalidated) > self.max_entries:
+            _, evicted = self.invalidated.popitem(last=False)
+            self.floor = max(self.floor, evicted)
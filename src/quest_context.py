@@ -0,0 +1,117 @@
+"""
+Compiled, cached quest context for submission handling.
+
+submit_task, process_auto_approval and update_submission need a quest's stage
+requirements and task list. A QuestContext is built once per quest from the
+`quests.stage_pass_requirements` and `faucet_tasks.tasks` columns:
+
+    stage_requirements  parsed to {stage: int} (JSON strings handled)
+    tasks_by_id         task dicts indexed by id (no linear scans)
+    stage_order         stage -> position, and the points available per stage
+
+QuestContextCache keeps one per quest. The quest and task writers in main.py
+invalidate it; `ttl` bounds staleness on workers that did not see the write.
+"""
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+STAGES = ['Beginner', 'Intermediate', 'Advance', 'Legend', 'Ultimate']
+
+
+def calculate_current_stage(stage_points: Dict[str, int], requirements: Dict[str, int]) -> str:
+    """Calculates the highest unlocked stage based on points."""
+    current_stage = 'Beginner'
+
+    for i, stage in enumerate(STAGES):
+        # Default requirement to 0 if not set, strict inequality vs >= depends on your rules
+        req = requirements.get(stage, 0)
+        points = stage_points.get(stage, 0)
+
+        if points >= req and req > 0:
+            # If we pass this stage, we are at least in the next stage (if it exists)
+            if i + 1 < len(STAGES):
+                current_stage = STAGES[i + 1]
+            else:
+                current_stage = stage # Max level
+        else:
+            # If we don't pass this stage, we stay at the current calculation
+            break
+
+    return current_stage
+
+
+def parse_requirements(raw: Any) -> Dict[str, int]:
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            raw = {}
+    requirements = {}
+    for stage, value in (raw or {}).items():
+        try:
+            requirements[stage] = int(value or 0)
+        except (TypeError, ValueError):
+            requirements[stage] = 0
+    return requirements
+
+
+class QuestContext:
+    def __init__(self, faucet_address: str, stage_requirements: Any, tasks: Optional[List[Dict]]):
+        self.faucet_address = faucet_address
+        self.stage_requirements = parse_requirements(stage_requirements)
+        self.tasks: List[Dict] = tasks or []
+        self.tasks_by_id: Dict[str, Dict] = {task['id']: task for task in self.tasks if task.get('id')}
+        self.stage_order: Dict[str, int] = {stage: i for i, stage in enumerate(STAGES)}
+        self.stage_points_available: Dict[str, int] = {stage: 0 for stage in STAGES}
+        for task in self.tasks_by_id.values():
+            stage = task.get('stage', 'Beginner')
+            self.stage_points_available[stage] = self.stage_points_available.get(stage, 0) + self.points_for(task)
+        self.loaded_at = time.monotonic()
+
+    def task(self, task_id: str) -> Optional[Dict]:
+        return self.tasks_by_id.get(task_id)
+
+    @staticmethod
+    def points_for(task: Dict) -> int:
+        try:
+            return int(task.get('points', 0) or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def current_stage(self, stage_points: Dict[str, int]) -> str:
+        return calculate_current_stage(stage_points or {}, self.stage_requirements)
+
+
+class QuestContextCache:
+    def __init__(self, load: Callable[[str], Awaitable[Optional[QuestContext]]], ttl: float = 300.0):
+        self.load = load
+        self.ttl = ttl
+        self.contexts: Dict[str, QuestContext] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        # Bumped by invalidate() so a load that raced a write is not stored
+        self.generations: Dict[str, int] = {}
+
+    async def get(self, faucet_address: str) -> Optional[QuestContext]:
+        key = faucet_address.lower()
+        context = self.contexts.get(key)
+        if context and time.monotonic() - context.loaded_at <= self.ttl:
+            return context
+
+        async with self.locks.setdefault(key, asyncio.Lock()):
+            context = self.contexts.get(key)
+            if context and time.monotonic() - context.loaded_at <= self.ttl:
+                return context
+            generation = self.generations.get(key, 0)
+            context = await self.load(faucet_address)
+            if context is not None and self.generations.get(key, 0) == generation:
+                self.contexts[key] = context
+            return context
+
+    def invalidate(self, *faucet_addresses: Optional[str]):
+        for faucet_address in faucet_addresses:
+            if faucet_address:
+                key = faucet_address.lower()
+                self.contexts.pop(key, None)
+                self.generations[key] = self.generations.get(key, 0) + 1
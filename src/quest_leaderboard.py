@@ -0,0 +1,116 @@
+"""
+Per-quest leaderboards kept in memory and updated as points are awarded.
+
+Each board holds the quest's participants (creator excluded) in a SortedList
+ordered by (-points, wallet), which gives O(log n) inserts, removals and
+rank lookups and O(log n + k) slices for the top-K and for the window
+around a wallet.
+
+    load        first read of a quest pages its quest_participants rows in
+    update      process_auto_approval, update_submission, daily_checkin and
+                join_quest call set_points() with the value they just wrote;
+                quests that are not loaded are skipped (the next load reads
+                the new value anyway); updates that arrive while a load is
+                paging are recorded and replayed on the loaded board, since
+                the pages may have been read before the write
+    expiry      a board is reloaded after `ttl` seconds so points written by
+                other workers show up
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+# (creator address, [{"wallet_address", "points"}, ...])
+LeaderboardLoader = Callable[[str], Awaitable[Tuple[str, List[Dict[str, Any]]]]]
+
+
+class QuestLeaderboard:
+    def __init__(self, creator_address: str, rows: List[Dict[str, Any]]):
+        self.creator = (creator_address or "").lower()
+        self.loaded_at = time.monotonic()
+        self.points: Dict[str, int] = {}
+        self.wallets: Dict[str, str] = {}  # lowercase -> address as stored
+        self.ranking = SortedList()
+        for row in rows:
+            self.set_points(row["wallet_address"], row.get("points") or 0)
+
+    def __len__(self) -> int:
+        return len(self.ranking)
+
+    def set_points(self, wallet: str, points: int):
+        wallet_l = wallet.lower()
+        if wallet_l == self.creator:
+            return
+        if wallet_l in self.points:
+            self.ranking.remove((-self.points[wallet_l], wallet_l))
+        self.points[wallet_l] = int(points)
+        self.wallets.setdefault(wallet_l, wallet)
+        self.ranking.add((-self.points[wallet_l], wallet_l))
+
+    def rank(self, wallet: str) -> Optional[int]:
+        """1-based rank, or None if the wallet has not joined"""
+        wallet_l = wallet.lower()
+        if wallet_l not in self.points:
+            return None
+        return self.ranking.index((-self.points[wallet_l], wallet_l)) + 1
+
+    def entries(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        return [
+            {"rank": start + offset + 1, "walletAddress": self.wallets[wallet_l], "points": -neg_points}
+            for offset, (neg_points, wallet_l) in enumerate(self.ranking.islice(start, stop))
+        ]
+
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        return self.entries(0, k)
+
+    def around(self, wallet: str, radius: int) -> List[Dict[str, Any]]:
+        """The wallet's entry with up to `radius` entries above and below it"""
+        rank = self.rank(wallet)
+        if rank is None:
+            return []
+        return self.entries(max(0, rank - 1 - radius), rank + radius)
+
+
+class LeaderboardService:
+    def __init__(self, load: LeaderboardLoader, ttl: float = 300.0):
+        self.load = load
+        self.ttl = ttl
+        self.boards: Dict[str, QuestLeaderboard] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        # Quest -> {wallet: (address, points)} set while its board is loading
+        self.pending: Dict[str, Dict[str, Tuple[str, int]]] = {}
+
+    async def board(self, quest_address: str) -> QuestLeaderboard:
+        key = quest_address.lower()
+        board = self.boards.get(key)
+        if board and time.monotonic() - board.loaded_at <= self.ttl:
+            return board
+
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            board = self.boards.get(key)
+            if board and time.monotonic() - board.loaded_at <= self.ttl:
+                return board
+            self.pending[key] = {}
+            try:
+                creator_address, rows = await self.load(quest_address)
+                board = QuestLeaderboard(creator_address, rows)
+                for wallet, points in self.pending[key].values():
+                    board.set_points(wallet, points)
+            finally:
+                del self.pending[key]
+            self.boards[key] = board
+            return board
+
+    def set_points(self, quest_address: str, wallet: str, points: int):
+        key = quest_address.lower()
+        if key in self.pending:
+            self.pending[key][wallet.lower()] = (wallet, points)
+        board = self.boards.get(key)
+        if board:
+            board.set_points(wallet, points)
+
+    def invalidate(self, quest_address: str):
+        self.boards.pop(quest_address.lower(), None)
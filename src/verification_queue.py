@@ -0,0 +1,210 @@
+"""
+Background queue for slow submission verifications.
+
+On-chain checks (Alchemy / RPC scans for wallet age can take tens of seconds)
+and Playwright social checks used to run inside the HTTP request. They are now
+jobs on a VerificationQueue:
+
+    pools       one asyncio.PriorityQueue + N workers per verification kind
+                (VERIFICATION_POOLS="onchain=4,social=1"), so a burst of
+                browser sessions cannot starve on-chain checks and vice versa
+    priority    lower runs first; ties run in submission order
+    retries     a job that raises is re-queued with exponential backoff (and
+                one step lower priority) until max_attempts, then fails
+    results     job status is kept in memory for polling and SSE; the job id
+                is the submission id, so other workers fall back to the
+                submission row
+    dedupe      submitting a job id that is still pending or running returns
+                the queued job instead of running the check twice
+
+Jobs are async callables returning a result dict; `on_failure` runs once a
+job has exhausted its retries.
+"""
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL = (SUCCEEDED, FAILED)
+
+
+def parse_pool_sizes(spec: Optional[str], defaults: Dict[str, int]) -> Dict[str, int]:
+    """'kind=workers,kind=workers' on top of the defaults"""
+    pools = dict(defaults)
+    for entry in (spec or "").split(","):
+        if "=" not in entry:
+            continue
+        kind, workers = entry.split("=", 1)
+        try:
+            pools[kind.strip()] = max(1, int(workers))
+        except ValueError:
+            print(f"⚠️ Ignoring invalid verification pool size: {entry!r}")
+    return pools
+
+
+class VerificationJob:
+    def __init__(
+        self,
+        job_id: str,
+        kind: str,
+        run: Callable[[], Awaitable[Dict[str, Any]]],
+        priority: int,
+        max_attempts: int,
+        on_failure: Optional[Callable[[str], Awaitable[None]]] = None
+    ):
+        self.id = job_id
+        self.kind = kind
+        self.run = run
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.on_failure = on_failure
+        self.attempts = 0
+        self.status = PENDING
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.changed = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at
+        }
+
+    def set_status(self, status: str):
+        self.status = status
+        self.updated_at = time.time()
+        # Wake every waiter, then re-arm for the next change
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class VerificationQueue:
+    def __init__(
+        self,
+        pools: Dict[str, int],
+        max_attempts: int = 3,
+        retry_delay: float = 5.0,
+        history: int = 5000
+    ):
+        self.pools = pools
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.history = history
+        self.queues: Dict[str, asyncio.PriorityQueue] = {}
+        self.workers: List[asyncio.Task] = []
+        self.jobs: "OrderedDict[str, VerificationJob]" = OrderedDict()
+        self.sequence = itertools.count()
+
+    def start(self):
+        if self.workers:
+            return
+        for kind, size in self.pools.items():
+            self.queues[kind] = asyncio.PriorityQueue()
+            self.workers += [asyncio.create_task(self.worker(kind)) for _ in range(size)]
+        pools = ", ".join(f"{kind}={size}" for kind, size in self.pools.items())
+        print(f"🧵 Verification queue started: {pools}")
+
+    async def stop(self):
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    # ------------------------------------------------------------------
+    # Submitting / reading
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        kind: str,
+        run: Callable[[], Awaitable[Dict[str, Any]]],
+        priority: int = 0,
+        job_id: Optional[str] = None,
+        on_failure: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> VerificationJob:
+        if kind not in self.queues:
+            raise ValueError(f"Unknown verification kind: {kind}")
+        existing = self.jobs.get(job_id) if job_id else None
+        if existing and existing.status not in TERMINAL:
+            return existing
+        job = VerificationJob(job_id or str(uuid.uuid4()), kind, run, priority, self.max_attempts, on_failure)
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.history:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if oldest.status not in TERMINAL:
+                break
+            del self.jobs[oldest_id]
+        self.enqueue(job)
+        return job
+
+    def enqueue(self, job: VerificationJob):
+        self.queues[job.kind].put_nowait((job.priority, next(self.sequence), job))
+
+    def get(self, job_id: str) -> Optional[VerificationJob]:
+        return self.jobs.get(job_id)
+
+    async def events(self, job: VerificationJob, heartbeat: float = 15.0) -> AsyncIterator[str]:
+        """Server-sent events: the job state on every change until it finishes"""
+        while True:
+            changed = job.changed
+            yield f"event: status\ndata: {json.dumps(job.to_dict(), default=str)}\n\n"
+            if job.status in TERMINAL:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    async def worker(self, kind: str):
+        queue = self.queues[kind]
+        while True:
+            _, _, job = await queue.get()
+            try:
+                await self.execute(job)
+            finally:
+                queue.task_done()
+
+    async def execute(self, job: VerificationJob):
+        job.attempts += 1
+        job.set_status(RUNNING)
+        try:
+            job.result = await job.run()
+            job.error = None
+            job.set_status(SUCCEEDED)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.error = str(e)
+            if job.attempts < job.max_attempts:
+                delay = self.retry_delay * 2 ** (job.attempts - 1)
+                print(f"🔁 Verification {job.id} failed (attempt {job.attempts}), retrying in {delay:g}s: {job.error}")
+                job.priority += 1
+                job.set_status(PENDING)
+                asyncio.get_running_loop().call_later(delay, self.enqueue, job)
+                return
+            print(f"❌ Verification {job.id} failed after {job.attempts} attempts: {job.error}")
+            job.set_status(FAILED)
+            if job.on_failure:
+                try:
+                    await job.on_failure(job.error)
+                except Exception as cleanup_error:
+                    print(f"⚠️ Verification failure handler for {job.id} failed: {cleanup_error}")
@@ -0,0 +1,32 @@
+-- Indexed copy of every factory transaction ingested by the analytics pipeline.
+-- Backs the cursor-paginated /analytics/transactions and /analytics/claims endpoints.
+create table if not exists public.analytics_transactions (
+    id                text primary key,            -- "<chainId>:<factory>:<txIndex>"
+    chain_id          integer not null,
+    network_name      text not null,
+    factory_address   text not null,
+    tx_index          integer not null,            -- position in factory.getAllTransactions()
+    faucet_address    text not null,               -- lowercased
+    transaction_type  text not null,
+    initiator         text not null,               -- lowercased
+    amount            text not null,               -- uint256 as a decimal string
+    is_ether          boolean not null default false,
+    token_symbol      text,
+    token_decimals    integer,
+    "timestamp"       bigint not null,
+    is_claim          boolean generated always as (position('claim' in lower(transaction_type)) > 0) stored
+);
+
+-- Every filter is paired with (timestamp, id) so keyset pagination stays an index range scan
+create index if not exists analytics_transactions_ts_idx
+    on public.analytics_transactions ("timestamp", id);
+create index if not exists analytics_transactions_chain_ts_idx
+    on public.analytics_transactions (chain_id, "timestamp", id);
+create index if not exists analytics_transactions_faucet_ts_idx
+    on public.analytics_transactions (faucet_address, "timestamp", id);
+create index if not exists analytics_transactions_initiator_ts_idx
+    on public.analytics_transactions (initiator, "timestamp", id);
+create index if not exists analytics_transactions_type_ts_idx
+    on public.analytics_transactions (transaction_type, "timestamp", id);
+create index if not exists analytics_transactions_claim_ts_idx
+    on public.analytics_transactions ("timestamp", id) where is_claim;
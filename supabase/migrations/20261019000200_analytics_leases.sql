@@ -0,0 +1,39 @@
+-- Cross-worker leases for the in-app analytics scheduler.
+-- A worker only refreshes while it holds the lease; an expired lease can be
+-- taken over, so a worker that dies mid-refresh never blocks the others.
+create table if not exists public.analytics_leases (
+    name        text primary key,
+    holder      text not null,
+    expires_at  timestamptz not null
+);
+
+create or replace function public.try_acquire_analytics_lease(
+    p_name text,
+    p_holder text,
+    p_ttl_seconds integer
+) returns boolean
+language plpgsql
+as $$
+declare
+    acquired text;
+begin
+    insert into public.analytics_leases as l (name, holder, expires_at)
+    values (p_name, p_holder, now() + make_interval(secs => p_ttl_seconds))
+    on conflict (name) do update
+        set holder = excluded.holder,
+            expires_at = excluded.expires_at
+        where l.expires_at < now() or l.holder = excluded.holder
+    returning l.holder into acquired;
+
+    return acquired is not null;
+end;
+$$;
+
+create or replace function public.release_analytics_lease(
+    p_name text,
+    p_holder text
+) returns void
+language sql
+as $$
+    delete from public.analytics_leases where name = p_name and holder = p_holder;
+$$;
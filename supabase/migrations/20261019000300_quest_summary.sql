@@ -0,0 +1,35 @@
+-- Listing projection for GET /api/quests: one row per quest with its task and
+-- participant counts, so the listing is a single filtered / paginated query
+-- instead of two extra round trips per quest.
+create index if not exists quest_participants_quest_address_idx
+    on public.quest_participants (quest_address);
+create index if not exists quests_created_at_idx
+    on public.quests (created_at desc, faucet_address);
+
+create or replace view public.quest_summary as
+select
+    q.faucet_address,
+    q.slug,
+    q.title,
+    q.description,
+    q.is_active,
+    q.is_draft,
+    q.reward_pool,
+    q.creator_address,
+    q.start_date,
+    q.end_date,
+    q.image_url,
+    q.token_symbol,
+    q.created_at,
+    case
+        when jsonb_typeof(to_jsonb(t.tasks)) = 'array' then jsonb_array_length(to_jsonb(t.tasks))
+        else 0
+    end as tasks_count,
+    -- Correlated count: evaluated only for the rows of the requested page
+    (
+        select count(*)
+        from public.quest_participants p
+        where p.quest_address = q.faucet_address
+    ) as participants_count
+from public.quests q
+left join public.faucet_tasks t on t.faucet_address = q.faucet_address;
@@ -0,0 +1,113 @@
+-- Atomic point award for an approved quest task.
+-- Replaces the read-modify-write in process_auto_approval / update_submission
+-- (read user_progress, edit stage_points / completed_tasks in Python, write it
+-- back, then read + write quest_participants.points), which lost updates when
+-- two approvals for the same wallet ran concurrently.
+--
+-- Everything happens in the function's transaction:
+--   * a per (quest, wallet) advisory lock serializes concurrent awards, including
+--     the first one that has to create the user_progress row
+--   * the task id is appended only if absent; a repeated award is a no-op that
+--     returns awarded = false and the current totals
+--   * stage_points[p_stage] is incremented and current_stage recomputed with the
+--     same rule as calculate_current_stage() in main.py; with null
+--     p_stage_requirements (quest context unavailable) the stage is kept
+--   * quest_participants.points is incremented in place
+--
+-- user_progress.completed_tasks and stage_points are jsonb.
+create or replace function public.award_quest_points(
+    p_faucet_address text,
+    p_wallet_address text,
+    p_task_id text,
+    p_points integer,
+    p_stage text,
+    p_stage_requirements jsonb default '{}'::jsonb
+) returns table (
+    awarded boolean,
+    total_points integer,
+    stage_points jsonb,
+    current_stage text,
+    participant_points integer
+)
+language plpgsql
+as $$
+declare
+    stages constant text[] := array['Beginner', 'Intermediate', 'Advance', 'Legend', 'Ultimate'];
+    progress public.user_progress%rowtype;
+    new_stage_points jsonb;
+    new_stage text := 'Beginner';
+    requirement integer;
+    new_participant_points integer;
+    i integer;
+begin
+    perform pg_advisory_xact_lock(hashtext('quest_award:' || p_faucet_address || ':' || p_wallet_address));
+
+    select * into progress
+    from public.user_progress up
+    where up.wallet_address = p_wallet_address
+      and up.faucet_address = p_faucet_address
+    for update;
+
+    if not found then
+        insert into public.user_progress (
+            wallet_address, faucet_address, total_points, stage_points,
+            completed_tasks, current_stage, updated_at
+        ) values (
+            p_wallet_address, p_faucet_address, 0,
+            '{"Beginner": 0, "Intermediate": 0, "Advance": 0, "Legend": 0, "Ultimate": 0}'::jsonb,
+            '[]'::jsonb, 'Beginner', now()
+        )
+        returning * into progress;
+    end if;
+
+    -- Idempotent: the task was already awarded
+    if coalesce(progress.completed_tasks, '[]'::jsonb) ? p_task_id then
+        select qp.points into new_participant_points
+        from public.quest_participants qp
+        where qp.quest_address = p_faucet_address
+          and qp.wallet_address = p_wallet_address;
+
+        return query select false, progress.total_points, progress.stage_points,
+                            progress.current_stage, new_participant_points;
+        return;
+    end if;
+
+    new_stage_points := coalesce(progress.stage_points, '{}'::jsonb);
+    new_stage_points := jsonb_set(
+        new_stage_points,
+        array[p_stage],
+        to_jsonb(coalesce((new_stage_points ->> p_stage)::integer, 0) + p_points)
+    );
+
+    -- Highest unlocked stage: walk the stages while each requirement is met
+    if p_stage_requirements is null then
+        new_stage := coalesce(progress.current_stage, 'Beginner');
+    else
+        for i in 1 .. array_length(stages, 1) loop
+            requirement := coalesce((p_stage_requirements ->> stages[i])::integer, 0);
+            exit when requirement <= 0
+                   or coalesce((new_stage_points ->> stages[i])::integer, 0) < requirement;
+            new_stage := stages[least(i + 1, array_length(stages, 1))];
+        end loop;
+    end if;
+
+    update public.user_progress up
+    set total_points = coalesce(up.total_points, 0) + p_points,
+        stage_points = new_stage_points,
+        completed_tasks = coalesce(up.completed_tasks, '[]'::jsonb) || jsonb_build_array(p_task_id),
+        current_stage = new_stage,
+        updated_at = now()
+    where up.wallet_address = p_wallet_address
+      and up.faucet_address = p_faucet_address
+    returning * into progress;
+
+    update public.quest_participants qp
+    set points = coalesce(qp.points, 0) + p_points
+    where qp.quest_address = p_faucet_address
+      and qp.wallet_address = p_wallet_address
+    returning qp.points into new_participant_points;
+
+    return query select true, progress.total_points, progress.stage_points,
+                        progress.current_stage, new_participant_points;
+end;
+$$;
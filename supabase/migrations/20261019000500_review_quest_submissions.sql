@@ -0,0 +1,185 @@
+-- Bulk approve / reject of quest submissions in one transaction.
+-- Backs POST /api/quests/{faucet}/submissions/review: instead of one
+-- PUT .../submissions/{id} (about six round trips) per proof, the API sends
+-- every decision at once and the writes are set-based:
+--
+--   1. one UPDATE of submissions for all decisions (scoped to the quest)
+--   2. per-wallet advisory locks (same key as award_quest_points), taken in
+--      wallet order so concurrent reviews cannot deadlock
+--   3. one INSERT of the missing user_progress rows
+--   4. point deltas grouped per wallet and stage; one UPDATE of user_progress
+--      (total, stage_points merge, completed_tasks append, stage recompute)
+--      and one UPDATE of quest_participants.points
+--
+-- A task is awarded at most once per wallet: tasks already in completed_tasks
+-- and duplicates inside the batch are approved without points.
+-- On-chain submissions are left alone: their verification job approves or
+-- deletes them, so they come back as not found.
+-- Null p_stage_requirements keeps each wallet's current_stage (as
+-- award_quest_points does).
+
+-- Same rule as calculate_current_stage() in src/quest_context.py
+create or replace function public.quest_stage_for(
+    p_stage_points jsonb,
+    p_stage_requirements jsonb
+) returns text
+language plpgsql
+immutable
+as $$
+declare
+    stages constant text[] := array['Beginner', 'Intermediate', 'Advance', 'Legend', 'Ultimate'];
+    result text := 'Beginner';
+    requirement integer;
+    i integer;
+begin
+    for i in 1 .. array_length(stages, 1) loop
+        requirement := coalesce((p_stage_requirements ->> stages[i])::integer, 0);
+        exit when requirement <= 0
+               or coalesce((p_stage_points ->> stages[i])::integer, 0) < requirement;
+        result := stages[least(i + 1, array_length(stages, 1))];
+    end loop;
+    return result;
+end;
+$$;
+
+create or replace function public.review_quest_submissions(
+    p_faucet_address text,
+    p_decisions jsonb,                          -- [{"submission_id": "...", "status": "approved" | "rejected"}]
+    p_tasks jsonb,                              -- {"<task id>": {"points": 10, "stage": "Beginner"}}
+    p_stage_requirements jsonb default '{}'::jsonb
+) returns table (
+    submission_id text,
+    status text,
+    wallet_address text,
+    task_id text,
+    awarded boolean,
+    points integer,
+    participant_points integer
+)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+    create temp table review_items (
+        submission_id text,
+        status text,
+        wallet_address text,
+        task_id text,
+        awarded boolean not null default false,
+        points integer not null default 0
+    ) on commit drop;
+
+    -- 1. Submission statuses
+    with decisions as (
+        select distinct on (d.submission_id) d.submission_id, d.status
+        from jsonb_to_recordset(p_decisions) as d(submission_id text, status text)
+    ), updated as (
+        update public.submissions s
+        set status = d.status,
+            reviewed_at = now()
+        from decisions d
+        where s.submission_id::text = d.submission_id
+          and s.faucet_address = p_faucet_address
+          and s.submission_type is distinct from 'onchain'
+        returning s.submission_id::text as submission_id, s.status, s.wallet_address, s.task_id
+    )
+    insert into review_items (submission_id, status, wallet_address, task_id)
+    select u.submission_id, u.status, u.wallet_address, u.task_id from updated u;
+
+    -- 2. Serialize with award_quest_points / other reviews for the same wallets
+    perform pg_advisory_xact_lock(hashtext('quest_award:' || p_faucet_address || ':' || w.wallet_address))
+    from (
+        select distinct r.wallet_address from review_items r
+        where r.status = 'approved'
+        order by r.wallet_address
+    ) w;
+
+    -- 3. Progress rows for first-time wallets
+    insert into public.user_progress (
+        wallet_address, faucet_address, total_points, stage_points,
+        completed_tasks, current_stage, updated_at
+    )
+    select distinct r.wallet_address, p_faucet_address, 0,
+           '{"Beginner": 0, "Intermediate": 0, "Advance": 0, "Legend": 0, "Ultimate": 0}'::jsonb,
+           '[]'::jsonb, 'Beginner', now()
+    from review_items r
+    where r.status = 'approved'
+      and not exists (
+          select 1 from public.user_progress up
+          where up.wallet_address = r.wallet_address
+            and up.faucet_address = p_faucet_address
+      );
+
+    -- Which approvals earn points: known task, not completed yet, first in the batch
+    update review_items r
+    set awarded = true,
+        points = coalesce((p_tasks -> r.task_id ->> 'points')::integer, 0)
+    from (
+        select distinct on (r2.wallet_address, r2.task_id) r2.submission_id
+        from review_items r2
+        join public.user_progress up
+          on up.wallet_address = r2.wallet_address
+         and up.faucet_address = p_faucet_address
+        where r2.status = 'approved'
+          and p_tasks ? r2.task_id
+          and not (coalesce(up.completed_tasks, '[]'::jsonb) ? r2.task_id)
+        order by r2.wallet_address, r2.task_id, r2.submission_id
+    ) first_award
+    where r.submission_id = first_award.submission_id;
+
+    -- 4. Grouped deltas -> one progress update and one participants update
+    with stage_deltas as (
+        select r.wallet_address,
+               coalesce(p_tasks -> r.task_id ->> 'stage', 'Beginner') as stage,
+               sum(r.points) as points
+        from review_items r
+        where r.awarded
+        group by 1, 2
+    ), deltas as (
+        select sd.wallet_address,
+               sum(sd.points)::integer as points,
+               jsonb_object_agg(sd.stage, sd.points) as stage_points,
+               (select jsonb_agg(r.task_id) from review_items r
+                where r.awarded and r.wallet_address = sd.wallet_address) as tasks
+        from stage_deltas sd
+        group by sd.wallet_address
+    ), merged as (
+        select d.wallet_address, d.points, d.tasks,
+               (select jsonb_object_agg(k, coalesce((up.stage_points ->> k)::integer, 0)
+                                          + coalesce((d.stage_points ->> k)::integer, 0))
+                from (select jsonb_object_keys(coalesce(up.stage_points, '{}'::jsonb))
+                      union
+                      select jsonb_object_keys(d.stage_points)) keys(k)) as new_stage_points
+        from deltas d
+        join public.user_progress up
+          on up.wallet_address = d.wallet_address
+         and up.faucet_address = p_faucet_address
+    ), progress as (
+        update public.user_progress up
+        set total_points = coalesce(up.total_points, 0) + m.points,
+            stage_points = m.new_stage_points,
+            completed_tasks = coalesce(up.completed_tasks, '[]'::jsonb) || m.tasks,
+            current_stage = case
+                when p_stage_requirements is null then coalesce(up.current_stage, 'Beginner')
+                else public.quest_stage_for(m.new_stage_points, p_stage_requirements)
+            end,
+            updated_at = now()
+        from merged m
+        where up.wallet_address = m.wallet_address
+          and up.faucet_address = p_faucet_address
+        returning up.wallet_address
+    )
+    update public.quest_participants qp
+    set points = coalesce(qp.points, 0) + d.points
+    from deltas d
+    where qp.quest_address = p_faucet_address
+      and qp.wallet_address = d.wallet_address;
+
+    return query
+    select r.submission_id, r.status, r.wallet_address, r.task_id, r.awarded, r.points, qp.points
+    from review_items r
+    left join public.quest_participants qp
+      on qp.quest_address = p_faucet_address
+     and qp.wallet_address = r.wallet_address;
+end;
+$$;
@@ -0,0 +1,78 @@
+-- Daily check-in as one conditional update.
+-- daily_checkin used to read the quest creator and the participant row, check
+-- the 24h cooldown in Python, then update points and log a submission: four
+-- round trips, and two concurrent check-ins could both pass the cooldown check.
+--
+-- The UPDATE's WHERE clause is the cooldown: a concurrent second check-in
+-- blocks on the row lock, re-evaluates the condition against the committed
+-- last_checkin_at and matches nothing. The submission log is written in the
+-- same transaction.
+--
+-- status: 'ok' | 'cooldown' | 'not_joined' | 'creator'
+create or replace function public.quest_daily_checkin(
+    p_faucet_address text,
+    p_wallet_address text,
+    p_points integer default 10,
+    p_cooldown_hours integer default 24
+) returns table (
+    status text,
+    points integer,
+    next_available_at timestamptz
+)
+language plpgsql
+as $$
+#variable_conflict use_column
+declare
+    cooldown constant interval := make_interval(hours => p_cooldown_hours);
+    new_points integer;
+    checked_in_at timestamptz;
+begin
+    update public.quest_participants qp
+    set points = coalesce(qp.points, 0) + p_points,
+        last_checkin_at = now()
+    where qp.quest_address = p_faucet_address
+      and qp.wallet_address = p_wallet_address
+      and (qp.last_checkin_at is null or qp.last_checkin_at <= now() - cooldown)
+      -- Creators cannot earn points on their own quest
+      and not exists (
+          select 1 from public.quests q
+          where q.faucet_address = p_faucet_address
+            and lower(q.creator_address) = lower(p_wallet_address)
+      )
+    returning qp.points, qp.last_checkin_at into new_points, checked_in_at;
+
+    if found then
+        insert into public.submissions (
+            faucet_address, wallet_address, task_id, task_title,
+            status, submitted_data, submitted_at
+        ) values (
+            p_faucet_address, p_wallet_address, 'sys_daily', 'Daily Check-in',
+            'approved', 'Daily Check-in', now()
+        );
+        return query select 'ok'::text, new_points, checked_in_at + cooldown;
+        return;
+    end if;
+
+    -- Nothing updated: work out why (read-only, no extra round trip for the API)
+    if exists (
+        select 1 from public.quests q
+        where q.faucet_address = p_faucet_address
+          and lower(q.creator_address) = lower(p_wallet_address)
+    ) then
+        return query select 'creator'::text, null::integer, null::timestamptz;
+        return;
+    end if;
+
+    select qp.points, qp.last_checkin_at into new_points, checked_in_at
+    from public.quest_participants qp
+    where qp.quest_address = p_faucet_address
+      and qp.wallet_address = p_wallet_address;
+
+    if not found then
+        return query select 'not_joined'::text, null::integer, null::timestamptz;
+        return;
+    end if;
+
+    return query select 'cooldown'::text, new_points, checked_in_at + cooldown;
+end;
+$$;
@@ -0,0 +1,64 @@
+-- Read model for GET /api/quests/{faucet}/progress/{wallet}.
+-- The endpoint used to lazily insert user_progress, read the quest's stage
+-- requirements, re-derive (and write) current_stage, then read submissions.
+-- Stages are now maintained on the write path instead:
+--
+--   * award_quest_points / review_quest_submissions recompute on every award
+--   * recompute_quest_stages() re-derives every participant's stage when a
+--     quest's stage_pass_requirements change (save_quest, finalize_quest)
+--
+-- so the read is one call to quest_progress(), which returns the progress row
+-- (null for wallets with no progress yet) and the wallet's submissions.
+
+create or replace function public.quest_progress(
+    p_faucet_address text,
+    p_wallet_address text
+) returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'progress', (
+            select to_jsonb(up)
+            from public.user_progress up
+            where up.faucet_address = p_faucet_address
+              and up.wallet_address = p_wallet_address
+            limit 1
+        ),
+        'submissions', coalesce((
+            select jsonb_agg(jsonb_build_object(
+                'submission_id', s.submission_id,
+                'task_id', s.task_id,
+                'task_title', s.task_title,
+                'status', s.status,
+                'submitted_data', s.submitted_data,
+                'submitted_at', s.submitted_at,
+                'notes', s.notes
+            ) order by s.submitted_at)
+            from public.submissions s
+            where s.faucet_address = p_faucet_address
+              and s.wallet_address = p_wallet_address
+        ), '[]'::jsonb)
+    );
+$$;
+
+create or replace function public.recompute_quest_stages(
+    p_faucet_address text,
+    p_stage_requirements jsonb
+) returns integer
+language plpgsql
+as $$
+declare
+    changed integer;
+begin
+    update public.user_progress up
+    set current_stage = public.quest_stage_for(coalesce(up.stage_points, '{}'::jsonb), coalesce(p_stage_requirements, '{}'::jsonb)),
+        updated_at = now()
+    where up.faucet_address = p_faucet_address
+      and up.current_stage is distinct from
+          public.quest_stage_for(coalesce(up.stage_points, '{}'::jsonb), coalesce(p_stage_requirements, '{}'::jsonb));
+
+    get diagnostics changed = row_count;
+    return changed;
+end;
+$$;
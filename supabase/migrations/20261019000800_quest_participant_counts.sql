@@ -0,0 +1,96 @@
+-- Maintained participant counters.
+-- The quest listing (quest_summary) and quest detail pages counted
+-- quest_participants rows on every read. A trigger now keeps one counter row
+-- per quest in the same transaction as the insert / delete, so every count is a
+-- primary-key read. reconcile_quest_participant_counts() repairs drift (e.g.
+-- rows changed with triggers disabled) and is run periodically by the app
+-- scheduler.
+create table if not exists public.quest_participant_counts (
+    quest_address text primary key,
+    participants  bigint not null default 0,
+    updated_at    timestamptz not null default now()
+);
+
+create or replace function public.bump_quest_participant_count()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('DELETE', 'UPDATE') then
+        update public.quest_participant_counts
+        set participants = greatest(participants - 1, 0),
+            updated_at = now()
+        where quest_address = old.quest_address;
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') then
+        insert into public.quest_participant_counts as c (quest_address, participants)
+        values (new.quest_address, 1)
+        on conflict (quest_address) do update
+            set participants = c.participants + 1,
+                updated_at = now();
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists quest_participants_count on public.quest_participants;
+create trigger quest_participants_count
+    after insert or delete or update of quest_address on public.quest_participants
+    for each row execute function public.bump_quest_participant_count();
+
+create or replace function public.reconcile_quest_participant_counts()
+returns integer
+language sql
+as $$
+    with actual as (
+        select quest_address, count(*) as participants
+        from public.quest_participants
+        group by quest_address
+    ), corrected as (
+        insert into public.quest_participant_counts as c (quest_address, participants)
+        select quest_address, participants from actual
+        on conflict (quest_address) do update
+            set participants = excluded.participants,
+                updated_at = now()
+            where c.participants <> excluded.participants
+        returning 1
+    ), emptied as (
+        update public.quest_participant_counts c
+        set participants = 0,
+            updated_at = now()
+        where c.participants <> 0
+          and not exists (select 1 from actual a where a.quest_address = c.quest_address)
+        returning 1
+    )
+    select ((select count(*) from corrected) + (select count(*) from emptied))::integer;
+$$;
+
+-- Backfill
+select public.reconcile_quest_participant_counts();
+
+-- The listing reads the counter instead of counting per quest
+create or replace view public.quest_summary as
+select
+    q.faucet_address,
+    q.slug,
+    q.title,
+    q.description,
+    q.is_active,
+    q.is_draft,
+    q.reward_pool,
+    q.creator_address,
+    q.start_date,
+    q.end_date,
+    q.image_url,
+    q.token_symbol,
+    q.created_at,
+    case
+        when jsonb_typeof(to_jsonb(t.tasks)) = 'array' then jsonb_array_length(to_jsonb(t.tasks))
+        else 0
+    end as tasks_count,
+    coalesce(c.participants, 0) as participants_count
+from public.quests q
+left join public.faucet_tasks t on t.faucet_address = q.faucet_address
+left join public.quest_participant_counts c on c.quest_address = q.faucet_address;
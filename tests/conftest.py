@@ -0,0 +1,86 @@
+"""
+Shared fixtures. src.main reads its settings at import time, so dummy values
+are set before it is imported; no test talks to Supabase or an RPC node.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("PRIVATE_KEY", "0x" + "11" * 32)
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+# Any JWT-shaped key passes the client's format check
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.test")
+os.environ.setdefault("ALCHEMY_API_KEY", "test-key")
+os.environ.setdefault("DISCORD_CLIENT_ID", "test")
+os.environ.setdefault("DISCORD_CLIENT_SECRET", "test")
+os.environ.setdefault("ANALYTICS_SNAPSHOT_DIR", tempfile.mkdtemp(prefix="analytics-snapshot-"))
+
+from src import main  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, supabase, table: str):
+        self.supabase = supabase
+        self.table = table
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def update(self, payload):
+        self.supabase.writes.append((self.table, payload))
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def or_(self, filters):
+        return self
+
+    def execute(self):
+        return FakeResponse(self.supabase.tables.get(self.table, []))
+
+
+class FakeRpc:
+    def __init__(self, supabase, name: str, params: dict):
+        self.supabase = supabase
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        self.supabase.rpc_calls.append((self.name, self.params))
+        return FakeResponse(self.supabase.rpc_results.get(self.name, []))
+
+
+class RecordingSupabase:
+    """Canned rows per table / RPC; records every RPC call and update payload"""
+
+    def __init__(self):
+        self.tables = {}
+        self.rpc_results = {}
+        self.rpc_calls = []
+        self.writes = []
+
+    def table(self, name: str):
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict = None):
+        return FakeRpc(self, name, params or {})
+
+    def calls(self, name: str):
+        return [params for called, params in self.rpc_calls if called == name]
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    fake = RecordingSupabase()
+    monkeypatch.setattr(main, "supabase", fake)
+    return fake
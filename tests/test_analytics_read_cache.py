@@ -0,0 +1,32 @@
+import asyncio
+
+from starlette.requests import Request
+
+from src.analytics_read_cache import AnalyticsReadCache
+
+
+def request(path: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+def test_payload_built_across_an_invalidate_is_not_cached():
+    cache = AnalyticsReadCache()
+    builds = []
+
+    async def build():
+        builds.append(1)
+        if len(builds) == 1:
+            # A refresh finishes while the first payload is being built
+            cache.invalidate()
+        return {"success": True, "build": len(builds)}
+
+    async def scenario():
+        first = await cache.respond(request("/analytics/users"), build)
+        second = await cache.respond(request("/analytics/users"), build)
+        third = await cache.respond(request("/analytics/users"), build)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first.body == b'{"success":true,"build":1}'
+    assert second.body == third.body == b'{"success":true,"build":2}'
+    assert len(builds) == 2
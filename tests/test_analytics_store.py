@@ -0,0 +1,34 @@
+import base64
+import json
+
+import pytest
+
+from src.analytics_store import decode_cursor, encode_cursor
+
+ROW_ID = "42220:0x" + "ab" * 20 + ":17"
+
+
+def raw_cursor(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(1700000000, ROW_ID)) == {"t": 1700000000, "id": ROW_ID}
+
+
+@pytest.mark.parametrize("data", [
+    {"t": 1700000000, "id": ROW_ID + '",id.gt.""'},
+    {"t": 1700000000, "id": "42220:0x" + "AB" * 20 + ":17"},
+    {"t": "1700000000),timestamp.gt.(0", "id": ROW_ID},
+    {"t": -1, "id": ROW_ID},
+    {"t": True, "id": ROW_ID},
+    {"t": 1700000000},
+])
+def test_cursors_that_are_not_row_positions_are_rejected(data):
+    with pytest.raises(ValueError):
+        decode_cursor(raw_cursor(data))
+
+
+def test_garbage_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
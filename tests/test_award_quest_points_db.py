@@ -0,0 +1,115 @@
+"""
+award_quest_points against a real Postgres. Set TEST_DATABASE_URL to a
+disposable database: the test creates the two tables it needs if they are
+missing and installs the function from the migration.
+"""
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import pytest
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if not DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL not set", allow_module_level=True)
+psycopg = pytest.importorskip("psycopg")
+
+MIGRATION = Path(__file__).resolve().parent.parent / "supabase" / "migrations" / "20261019000400_award_quest_points.sql"
+
+SCHEMA = """
+create table if not exists public.user_progress (
+    wallet_address  text,
+    faucet_address  text,
+    total_points    integer,
+    stage_points    jsonb,
+    completed_tasks jsonb,
+    current_stage   text,
+    updated_at      timestamptz
+);
+create table if not exists public.quest_participants (
+    quest_address  text,
+    wallet_address text,
+    points         integer
+);
+"""
+
+WALLET = "0x" + "bb" * 20
+
+
+@pytest.fixture
+def faucet():
+    faucet_address = "0x" + uuid.uuid4().hex.ljust(40, "0")
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute(SCHEMA)
+        conn.execute(MIGRATION.read_text())
+        conn.execute(
+            "insert into public.quest_participants (quest_address, wallet_address, points) values (%s, %s, 0)",
+            (faucet_address, WALLET)
+        )
+    yield faucet_address
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute("delete from public.user_progress where faucet_address = %s", (faucet_address,))
+        conn.execute("delete from public.quest_participants where quest_address = %s", (faucet_address,))
+
+
+def award(faucet_address, task_id, points=5, stage="Beginner", requirements=None):
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        return conn.execute(
+            "select * from public.award_quest_points(%s, %s, %s, %s, %s, %s::jsonb)",
+            (faucet_address, WALLET, task_id, points, stage, json.dumps(requirements) if requirements is not None else None)
+        ).fetchone()
+
+
+def progress_rows(faucet_address):
+    with psycopg.connect(DATABASE_URL) as conn:
+        return conn.execute(
+            "select total_points, stage_points, completed_tasks, current_stage from public.user_progress where faucet_address = %s",
+            (faucet_address,)
+        ).fetchall()
+
+
+def participant_points(faucet_address):
+    with psycopg.connect(DATABASE_URL) as conn:
+        return conn.execute(
+            "select points from public.quest_participants where quest_address = %s", (faucet_address,)
+        ).fetchone()[0]
+
+
+def test_concurrent_awards_lose_no_updates(faucet):
+    # 20 distinct tasks plus 5 repeats of one of them, all released at once
+    task_ids = [f"task-{i}" for i in range(20)] + ["task-0"] * 5
+    barrier = threading.Barrier(len(task_ids))
+    errors = []
+
+    def run(task_id):
+        try:
+            barrier.wait()
+            award(faucet, task_id, requirements={"Beginner": 50})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(task_id,)) for task_id in task_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    # One progress row even though every call raced to create it
+    (total_points, stage_points, completed_tasks, current_stage), = progress_rows(faucet)
+    assert total_points == 100
+    assert stage_points["Beginner"] == 100
+    assert sorted(completed_tasks) == sorted(set(task_ids))
+    assert current_stage == "Intermediate"
+    assert participant_points(faucet) == 100
+
+
+def test_null_requirements_keep_the_current_stage(faucet):
+    award(faucet, "first", requirements={"Beginner": 5})
+    assert progress_rows(faucet)[0][3] == "Intermediate"
+
+    awarded, total_points, _, current_stage, _ = award(faucet, "second", requirements=None)
+    assert awarded and total_points == 10
+    assert current_stage == "Intermediate"
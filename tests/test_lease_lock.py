@@ -0,0 +1,57 @@
+import asyncio
+
+from src.analytics_scheduler import LeaseLock
+
+
+class FailingRpc:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def rpc(self, name, params):
+        return self
+
+    def execute(self):
+        raise self.error
+
+
+class CountingRpc:
+    def __init__(self):
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append(name)
+        return self
+
+    def execute(self):
+        return type("Response", (), {"data": True})()
+
+
+def test_missing_lease_function_falls_back_to_the_file_lock(tmp_path):
+    lease = LeaseLock(FailingRpc(Exception("function public.try_acquire_analytics_lease does not exist")), str(tmp_path))
+    assert asyncio.run(lease.acquire("refresh", 60))
+    assert "refresh" in lease.file_handles
+    lease.release_file_lock("refresh")
+
+
+def test_other_rpc_errors_do_not_acquire(tmp_path):
+    lease = LeaseLock(FailingRpc(Exception("connection reset by peer")), str(tmp_path))
+    assert not asyncio.run(lease.acquire("refresh", 60))
+    assert lease.file_handles == {}
+
+
+def test_renewed_lease_is_extended_until_released(tmp_path):
+    supabase = CountingRpc()
+    lease = LeaseLock(supabase, str(tmp_path))
+
+    async def scenario():
+        assert await lease.acquire("refresh", 0.03, renew=True)
+        await asyncio.sleep(0.05)
+        await lease.release("refresh")
+        renewed = supabase.calls.count("try_acquire_analytics_lease")
+        await asyncio.sleep(0.05)
+        return renewed
+
+    renewed = asyncio.run(scenario())
+    assert renewed >= 3
+    assert supabase.calls.count("try_acquire_analytics_lease") == renewed
+    assert lease.renewals == {}
@@ -0,0 +1,59 @@
+from src.quest_cache import QuestDetailCache, QuestProgressCache
+
+FAUCET = "0x" + "aa" * 20
+WALLET = "0x" + "bb" * 20
+OTHER_WALLET = "0x" + "cc" * 20
+
+
+def test_progress_load_that_raced_an_invalidate_is_not_stored():
+    cache = QuestProgressCache()
+    generation = cache.generation()
+    cache.invalidate(FAUCET, WALLET.upper())
+    cache.store(FAUCET, WALLET, {"totalPoints": 0}, generation)
+    assert cache.lookup(FAUCET, WALLET) is None
+
+    cache.store(FAUCET, WALLET, {"totalPoints": 10}, cache.generation())
+    assert cache.lookup(FAUCET, WALLET) == {"totalPoints": 10}
+
+
+def test_progress_load_that_raced_a_quest_write_is_not_stored():
+    cache = QuestProgressCache()
+    generation = cache.generation()
+    cache.invalidate_quest(FAUCET)
+    cache.store(FAUCET, WALLET, {"totalPoints": 0}, generation)
+    assert cache.lookup(FAUCET, WALLET) is None
+
+
+def test_other_wallets_invalidations_do_not_block_a_store():
+    cache = QuestProgressCache()
+    generation = cache.generation()
+    cache.invalidate(FAUCET, OTHER_WALLET)
+    cache.store(FAUCET, WALLET, {"totalPoints": 5}, generation)
+    assert cache.lookup(FAUCET, WALLET) == {"totalPoints": 5}
+
+
+def test_evicted_invalidation_marks_still_block_older_loads():
+    cache = QuestProgressCache(max_entries=2)
+    generation = cache.generation()
+    cache.invalidate(FAUCET, WALLET)
+    for i in range(3):
+        cache.invalidate(FAUCET, f"0x{i:040x}")
+    cache.store(FAUCET, WALLET, {"totalPoints": 0}, generation)
+    assert cache.lookup(FAUCET, WALLET) is None
+
+
+async def no_participants(address):
+    return 0
+
+
+def test_detail_load_that_raced_an_invalidate_is_served_but_not_stored():
+    cache = QuestDetailCache(no_participants)
+    generation = cache.generation()
+    cache.invalidate(FAUCET.upper())
+    payload = cache.store({"faucetAddress": FAUCET, "slug": "old", "title": "Old"}, 3, generation)
+    assert payload["title"] == "Old" and payload["totalParticipants"] == 3
+    assert cache.lookup(FAUCET) is None
+    assert cache.lookup_slug("old") is None
+
+    cache.store({"faucetAddress": FAUCET, "slug": "new", "title": "New"}, 3, cache.generation())
+    assert cache.lookup_slug("new")["title"] == "New"
@@ -0,0 +1,30 @@
+import asyncio
+
+from src.quest_leaderboard import LeaderboardService
+
+FAUCET = "0x" + "aa" * 20
+WALLET = "0x" + "bB" * 20
+OTHER_WALLET = "0x" + "cc" * 20
+
+
+def test_points_set_during_a_load_are_not_lost():
+    async def scenario():
+        released = asyncio.Event()
+
+        async def load(quest_address):
+            # Pages read before the award below was written
+            await released.wait()
+            return "", [{"wallet_address": WALLET, "points": 5}, {"wallet_address": OTHER_WALLET, "points": 20}]
+
+        service = LeaderboardService(load)
+        loading = asyncio.create_task(service.board(FAUCET))
+        await asyncio.sleep(0)
+        service.set_points(FAUCET.upper(), WALLET, 30)
+        released.set()
+        return await loading
+
+    board = asyncio.run(scenario())
+    assert board.top(2) == [
+        {"rank": 1, "walletAddress": WALLET, "points": 30},
+        {"rank": 2, "walletAddress": OTHER_WALLET, "points": 20}
+    ]
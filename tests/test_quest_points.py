@@ -0,0 +1,74 @@
+import asyncio
+import itertools
+
+from src import main
+from src.quest_context import STAGES, QuestContext, calculate_current_stage
+from src.quest_leaderboard import QuestLeaderboard
+
+FAUCET = "0x" + "aa" * 20
+WALLET = "0x" + "bb" * 20
+
+
+def sql_stage_for(stage_points, requirements):
+    """The stage loop of award_quest_points / quest_stage_for, line for line"""
+    result = "Beginner"
+    for i, stage in enumerate(STAGES):
+        requirement = requirements.get(stage, 0)
+        if requirement <= 0 or stage_points.get(stage, 0) < requirement:
+            break
+        result = STAGES[min(i + 1, len(STAGES) - 1)]
+    return result
+
+
+def test_stage_rule_matches_calculate_current_stage():
+    requirements = {"Beginner": 20, "Intermediate": 50, "Advance": 80, "Legend": 100, "Ultimate": 150}
+    for points in itertools.product((0, 20, 60, 100, 150), repeat=len(STAGES)):
+        stage_points = dict(zip(STAGES, points))
+        assert calculate_current_stage(stage_points, requirements) == sql_stage_for(stage_points, requirements)
+
+
+def test_stage_rule_edges():
+    assert calculate_current_stage({}, {}) == "Beginner"
+    # A stage without a requirement blocks everything after it
+    assert calculate_current_stage({"Beginner": 99, "Intermediate": 99}, {"Beginner": 0, "Intermediate": 10}) == "Beginner"
+    # Meeting a requirement exactly unlocks the next stage
+    assert calculate_current_stage({"Beginner": 20}, {"Beginner": 20, "Intermediate": 50}) == "Intermediate"
+    # The last stage stays the last stage
+    every_stage = {stage: 10 for stage in STAGES}
+    assert calculate_current_stage(every_stage, every_stage) == "Ultimate"
+
+
+def test_award_task_points_sends_one_rpc_and_applies_its_totals(supabase, monkeypatch):
+    supabase.rpc_results["award_quest_points"] = [{
+        "awarded": True,
+        "total_points": 35,
+        "stage_points": {"Beginner": 35},
+        "current_stage": "Intermediate",
+        "participant_points": 45
+    }]
+    board = QuestLeaderboard(None, [{"wallet_address": WALLET, "points": 30}])
+    monkeypatch.setitem(main.leaderboards.boards, FAUCET.lower(), board)
+    main.quest_progress_cache.store(FAUCET, WALLET, {"totalPoints": 20}, main.quest_progress_cache.generation())
+
+    result = asyncio.run(main.award_task_points(
+        FAUCET, WALLET, {"id": "follow", "points": "15"}, QuestContext(FAUCET, '{"Beginner": "20"}', []).stage_requirements
+    ))
+
+    assert supabase.calls("award_quest_points") == [{
+        "p_faucet_address": FAUCET,
+        "p_wallet_address": WALLET,
+        "p_task_id": "follow",
+        "p_points": 15,
+        "p_stage": "Beginner",
+        "p_stage_requirements": {"Beginner": 20}
+    }]
+    assert result["current_stage"] == "Intermediate"
+    assert board.entries(0, 1)[0]["points"] == 45
+    assert main.quest_progress_cache.lookup(FAUCET, WALLET) is None
+
+
+def test_award_task_points_defaults(supabase):
+    supabase.rpc_results["award_quest_points"] = []
+    assert asyncio.run(main.award_task_points(FAUCET, WALLET, {"id": "follow"}, None)) is None
+    (params,) = supabase.calls("award_quest_points")
+    assert params["p_points"] == 0 and params["p_stage_requirements"] is None
@@ -0,0 +1,90 @@
+"""
+review_quest_submissions against a real Postgres (see
+test_award_quest_points_db.py for TEST_DATABASE_URL).
+"""
+import json
+import os
+import uuid
+from pathlib import Path
+
+import pytest
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if not DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL not set", allow_module_level=True)
+psycopg = pytest.importorskip("psycopg")
+
+MIGRATION = Path(__file__).resolve().parent.parent / "supabase" / "migrations" / "20261019000500_review_quest_submissions.sql"
+
+SCHEMA = """
+create table if not exists public.user_progress (
+    wallet_address  text,
+    faucet_address  text,
+    total_points    integer,
+    stage_points    jsonb,
+    completed_tasks jsonb,
+    current_stage   text,
+    updated_at      timestamptz
+);
+create table if not exists public.quest_participants (
+    quest_address  text,
+    wallet_address text,
+    points         integer
+);
+create table if not exists public.submissions (
+    submission_id   text primary key,
+    faucet_address  text,
+    wallet_address  text,
+    task_id         text,
+    submission_type text,
+    status          text,
+    reviewed_at     timestamptz
+);
+"""
+
+WALLET = "0x" + "bb" * 20
+TASKS = {"proof": {"points": 10, "stage": "Beginner"}, "hold": {"points": 20, "stage": "Beginner"}}
+
+
+@pytest.fixture
+def faucet():
+    faucet_address = "0x" + uuid.uuid4().hex.ljust(40, "0")
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute(SCHEMA)
+        conn.execute(MIGRATION.read_text())
+        conn.execute(
+            "insert into public.quest_participants (quest_address, wallet_address, points) values (%s, %s, 0)",
+            (faucet_address, WALLET)
+        )
+    yield faucet_address
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        for table, column in (("user_progress", "faucet_address"), ("quest_participants", "quest_address"), ("submissions", "faucet_address")):
+            conn.execute(f"delete from public.{table} where {column} = %s", (faucet_address,))
+
+
+def add_submission(faucet_address, task_id, submission_type):
+    submission_id = uuid.uuid4().hex
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute(
+            "insert into public.submissions (submission_id, faucet_address, wallet_address, task_id, submission_type, status)"
+            " values (%s, %s, %s, %s, %s, 'pending')",
+            (submission_id, faucet_address, WALLET, task_id, submission_type)
+        )
+    return submission_id
+
+
+def test_onchain_submissions_are_not_manually_reviewed(faucet):
+    manual = add_submission(faucet, "proof", "manual")
+    onchain = add_submission(faucet, "hold", "onchain")
+
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        rows = conn.execute(
+            "select submission_id, awarded, participant_points from public.review_quest_submissions(%s, %s::jsonb, %s::jsonb, null)",
+            (faucet, json.dumps([{"submission_id": sid, "status": "approved"} for sid in (manual, onchain)]), json.dumps(TASKS))
+        ).fetchall()
+        statuses = dict(conn.execute(
+            "select submission_id, status from public.submissions where faucet_address = %s", (faucet,)
+        ).fetchall())
+
+    assert rows == [(manual, True, 10)]
+    assert statuses == {manual: "approved", onchain: "pending"}
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from src import main
+from src.quest_context import QuestContext
+
+FAUCET = "0x" + "aa" * 20
+WALLET = "0x" + "bb" * 20
+STAGE_REQUIREMENTS = {"Beginner": 20, "Intermediate": 50}
+
+
+@pytest.fixture
+def context(monkeypatch):
+    context = QuestContext(FAUCET, STAGE_REQUIREMENTS, [
+        {"id": "follow", "title": "Follow", "points": "15", "stage": "Intermediate"},
+        {"id": "quiz", "title": "Quiz", "points": 5}
+    ])
+
+    async def get_quest_context(faucet_address):
+        return context
+
+    monkeypatch.setattr(main, "get_quest_context", get_quest_context)
+    return context
+
+
+def approve_single(supabase, task_id):
+    supabase.tables["submissions"] = [{"submission_id": "s1", "wallet_address": WALLET, "task_id": task_id}]
+    asyncio.run(main.update_submission(FAUCET, "s1", main.SubmissionUpdate(status="approved")))
+    (params,) = supabase.calls("award_quest_points")
+    return {"points": params["p_points"], "stage": params["p_stage"]}, params["p_stage_requirements"]
+
+
+def approve_bulk(supabase):
+    asyncio.run(main.review_submissions_bulk(FAUCET, main.BulkSubmissionUpdate(submissionIds=["s1"], status="approved")))
+    (params,) = supabase.calls("review_quest_submissions")
+    return params["p_tasks"], params["p_stage_requirements"]
+
+
+@pytest.mark.parametrize("task_id", ["follow", "quiz", "sys_daily"])
+def test_bulk_and_single_approval_award_the_same_progress(supabase, context, task_id):
+    single_award, single_requirements = approve_single(supabase, task_id)
+    bulk_tasks, bulk_requirements = approve_bulk(supabase)
+
+    assert bulk_tasks[task_id] == single_award
+    assert bulk_requirements == single_requirements == STAGE_REQUIREMENTS
+
+
+def test_system_tasks_are_reviewable_without_points(supabase, context):
+    award, _ = approve_single(supabase, "sys_daily")
+    assert award == {"points": 0, "stage": "Beginner"}
@@ -0,0 +1,29 @@
+import asyncio
+
+from src.verification_queue import SUCCEEDED, VerificationQueue
+
+
+def test_resubmitting_a_queued_job_id_runs_it_once():
+    async def scenario():
+        queue = VerificationQueue({"onchain": 1})
+        queue.start()
+        runs = []
+
+        async def check():
+            runs.append(1)
+            return {"verified": True}
+
+        first = queue.submit("onchain", check, job_id="42")
+        second = queue.submit("onchain", check, job_id="42")
+        await asyncio.sleep(0.01)
+
+        # Once finished, the id can be queued again (e.g. by the recovery sweep)
+        third = queue.submit("onchain", check, job_id="42")
+        await asyncio.sleep(0.01)
+        await queue.stop()
+        return first, second, third, runs
+
+    first, second, third, runs = asyncio.run(scenario())
+    assert second is first
+    assert third is not first and third.status == SUCCEEDED
+    assert len(runs) == 2